@@ -1,5 +1,14 @@
 __author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@energyville.be>'
-from .df_to_db import add_df_to_db
+from .cli import convert_gdx
+from .df_to_db import add_df_to_db, update_db_from_df
 from .domain_info import DomainInfo
 from .gams_add_on_exception import GamsAddOnException
-from .gdx_to_df import gdx_to_df, db_to_df
+from .gdx_async import agdx_to_df
+from .gdx_batch import gdx_to_df_many
+from .gdx_cache import GdxCache
+from .gdx_diff import gdx_diff, db_diff
+from .gdx_file import GdxFile, GdxSymbol
+from .gdx_reader import GdxReader, gdx_to_dfs
+from .gdx_to_array import gdx_to_array, gdx_to_xarray, db_to_array
+from .gdx_to_df import gdx_to_df, db_to_df, iter_gdx_chunks, iter_db_chunks, get_scalars, get_db_scalars
+from .instrumentation import add_listener, remove_listener, record_stages
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import gams
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from .gams_add_on_exception import GamsAddOnException
+from .gdx_api import GdxHandle
+from .gdx_to_df import iter_db_chunks
+from .workspace import get_workspace
+
+FORMATS = {
+    "parquet": ".parquet",
+    "arrow": ".arrows",
+}
+
+
+def convert_gdx(gdx_file, out_dir, fmt="parquet", symbols=None, jobs=1, chunksize=1000000):
+    """
+    Write every symbol of a gdx file (or only symbols) to its own Parquet or Arrow IPC stream file in out_dir.
+    Symbols are streamed in record batches of at most chunksize records, with the domains as dictionary encoded
+    columns, so memory is bounded by the chunk size. With jobs > 1 the symbols are divided over worker processes.
+    Returns the list of written files.
+    """
+    if pa is None:
+        raise GamsAddOnException("Converting gdx files needs pyarrow, install it with: pip install pyarrow")
+    if fmt not in FORMATS:
+        raise GamsAddOnException("format %s not defined, use one of %s" % (fmt, sorted(FORMATS)))
+    if symbols is None:
+        with GdxHandle(gdx_file) as gdx:
+            symbols = [info.name for info in gdx.symbols() if info.type != "Alias"]
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+
+    if jobs is None or jobs <= 1 or len(symbols) <= 1:
+        return _convert_symbols(gdx_file, out_dir, fmt, symbols, chunksize)
+
+    # every worker loads the gdx file once for its share of the symbols
+    groups = [symbols[i::jobs] for i in range(min(jobs, len(symbols)))]
+    paths = list()
+    with ProcessPoolExecutor(max_workers=len(groups)) as pool:
+        for result in pool.map(_convert_symbols, [gdx_file] * len(groups), [out_dir] * len(groups),
+                               [fmt] * len(groups), groups, [chunksize] * len(groups)):
+            paths.extend(result)
+    return paths
+
+
+def _convert_symbols(gdx_file, out_dir, fmt, symbols, chunksize):
+    db = get_workspace().add_database_from_gdx(gdx_file)
+    paths = list()
+    for symbol in symbols:
+        path = os.path.join(out_dir, symbol + FORMATS[fmt])
+        writer = None
+        # the value columns get the same type whether the symbol has records or not
+        value_type = pa.bool_() if type(db.get_symbol(symbol)) == gams.GamsSet else pa.float64()
+        try:
+            for df in iter_db_chunks(db, symbol, chunksize, gams_type="all", index_dtype="str"):
+                table = _to_table(df, symbol, value_type)
+                if writer is None:
+                    if fmt == "parquet":
+                        writer = pq.ParquetWriter(path, table.schema)
+                    else:
+                        writer = pa.ipc.new_stream(path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        paths.append(path)
+    return paths
+
+
+def _to_table(df, symbol, value_type=None):
+    """
+    Arrow table of a chunk with one dictionary encoded column per domain, built from the index codes without
+    resetting the index.
+    """
+    if not isinstance(df, (pd.DataFrame, pd.Series)):
+        return pa.table({symbol: pa.array([df], type=pa.float64())})
+    if isinstance(df, pd.Series):
+        return pa.table(dict((str(k), pa.array([v], type=pa.float64())) for k, v in df.items()))
+
+    index = df.index
+    if isinstance(index, pd.MultiIndex):
+        levels = zip(index.names, index.levels, index.codes)
+    else:
+        codes, uniques = pd.factorize(index)
+        levels = [(index.name, uniques, codes)]
+
+    names = list()
+    arrays = list()
+    for name, level, codes in levels:
+        indices = pa.array(np.asarray(codes, dtype=np.int32))
+        dictionary = pa.array(np.asarray(level.astype(str), dtype=object), type=pa.string())
+        names.append(_unique(str(name), names))
+        arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+    for col in df.columns:
+        names.append(_unique(str(col), names))
+        arrays.append(pa.array(df[col].to_numpy(), type=value_type))
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def _unique(name, names):
+    # e.g. a parameter over (S, S) gets the columns S and S_2
+    unique = name
+    n = 2
+    while unique in names:
+        unique = "%s_%d" % (name, n)
+        n += 1
+    return unique
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="gams-addon", description="Tools for GAMS gdx files")
+    commands = parser.add_subparsers(dest="command")
+
+    convert = commands.add_parser("convert", help="convert every symbol of a gdx file to Parquet or Arrow files")
+    convert.add_argument("gdx_file")
+    convert.add_argument("out_dir")
+    convert.add_argument("--format", default="parquet", choices=sorted(FORMATS))
+    convert.add_argument("--symbols", nargs="+", help="only convert these symbols")
+    convert.add_argument("--jobs", type=int, default=1, help="number of worker processes")
+    convert.add_argument("--chunksize", type=int, default=1000000, help="records per record batch")
+
+    args = parser.parse_args(argv)
+    if args.command != "convert":
+        parser.print_help()
+        return 1
+    try:
+        paths = convert_gdx(args.gdx_file, args.out_dir, args.format, args.symbols, args.jobs, args.chunksize)
+    except (GamsAddOnException, IOError) as e:
+        sys.stderr.write("%s\n" % e)
+        return 1
+    for path in paths:
+        print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
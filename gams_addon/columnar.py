@@ -0,0 +1,429 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+from itertools import product
+from operator import attrgetter
+
+import gams
+import numpy as np
+import pandas as pd
+
+from .gams_add_on_exception import GamsAddOnException
+
+# GAMS attribute name -> record attribute of GamsVariableRecord/GamsEquationRecord
+VAR_EQU_ATTRIBUTES = {
+    "L": "level",
+    "M": "marginal",
+    "LO": "lower",
+    "UP": "upper",
+    "SCALE": "scale",
+}
+
+
+class UelTable(object):
+    """
+    Maps unique element labels (UELs) to integer codes. Codes start at 1, as they do in a gdx file, so that
+    code 0 is never a valid label.
+    """
+
+    def __init__(self, labels=None):
+        self.labels = [None]
+        self.codes = dict()
+        self._array = None
+        self._dtype = None
+        if labels is not None:
+            for label in labels:
+                self.add(label)
+
+    def __len__(self):
+        return len(self.labels) - 1
+
+    def add(self, label):
+        code = self.codes.get(label)
+        if code is None:
+            code = len(self.labels)
+            self.codes[label] = code
+            self.labels.append(label)
+        return code
+
+    def as_array(self):
+        if self._array is None or len(self._array) != len(self.labels):
+            self._array = np.array(self.labels, dtype=object)
+        return self._array
+
+    def dtype(self):
+        """
+        CategoricalDtype with all labels as categories. The same object is returned as long as no labels are added,
+        so that all frames extracted with this table share their categories.
+        """
+        if self._dtype is None or len(self._dtype.categories) != len(self):
+            self._dtype = pd.CategoricalDtype(pd.Index(self.labels[1:], dtype=object))
+        return self._dtype
+
+
+# values of the GAMS special values as returned by the records of the Python API; EPS is the my_eps of the workspace
+SPECIAL_VALUES = {
+    "EPS": gams.SV_EPS,
+    "NA": gams.SV_NA,
+    "UNDF": gams.SV_UNDEF,
+    "INF": gams.SV_PINF,
+    "-INF": gams.SV_MINF,
+}
+
+
+def workspace_eps(db):
+    """
+    Value of EPS in the records of a GamsDatabase: the my_eps of its workspace.
+    """
+    eps = db.workspace.my_eps
+    return gams.SV_EPS if eps is None else eps
+
+
+def map_specials(values, specials=None, fillna=None, eps=None):
+    """
+    Replace the GAMS special values in a float64 array in place: specials maps names of SPECIAL_VALUES to the value
+    they are replaced by, e.g. {"EPS": 0.0, "NA": np.nan}. eps is the value of EPS in values (see workspace_eps).
+    Afterwards NaN values are set to fillna, when given.
+    """
+    if specials:
+        masks = [(__special_mask(values, name, eps), value) for name, value in specials.items()]
+        for mask, value in masks:
+            values[mask] = value
+    if fillna is not None:
+        values[np.isnan(values)] = fillna
+    return values
+
+
+def unmap_specials(values, specials=None, eps=None):
+    """
+    Inverse of map_specials: values equal to a value of specials are set back to the special value. The round trip is
+    exact when the replacement values do not occur as regular values (or, for parameters, when they are 0, which is
+    never stored). For variables and equations {"EPS": 0.0} writes every 0 (of any attribute) as EPS. specials must
+    map every special value to a different value, otherwise the inverse is ambiguous.
+    """
+    if specials:
+        replacements = ["nan" if value != value else value for value in specials.values()]
+        if len(set(replacements)) != len(replacements):
+            raise GamsAddOnException("specials %s maps several special values to the same value, they can not be "
+                                     "written back" % (specials,))
+        masks = list()
+        for name, value in specials.items():
+            mask = np.isnan(values) if value != value else values == value
+            masks.append((mask, __special_value(name, eps)))
+        for mask, value in masks:
+            values[mask] = value
+    return values
+
+
+def __special_value(name, eps=None):
+    if name not in SPECIAL_VALUES:
+        raise GamsAddOnException("special value %s not defined, use one of %s" % (name, sorted(SPECIAL_VALUES)))
+    if name == "EPS" and eps is not None:
+        return eps
+    return SPECIAL_VALUES[name]
+
+
+def __special_mask(values, name, eps=None):
+    special = __special_value(name, eps)
+    if special != special:
+        return np.isnan(values)
+    return values == special
+
+
+class ColumnBlock(object):
+    """
+    Columnar copy of (a part of) the records of a symbol: one row of UEL codes per record and one float column per
+    requested attribute.
+    """
+
+    def __init__(self, codes, values, uels, texts=None):
+        self.codes = codes
+        self.values = values
+        self.uels = uels
+        self.texts = texts
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+
+def iter_blocks(symbol, attributes=(), chunksize=None, records=None, uels=None, dtype=np.float64, texts=False,
+                specials=None, fillna=None):
+    """
+    Walk the records of a symbol once and yield ColumnBlocks of at most chunksize records. Without a chunksize a single
+    block with all records is yielded. records can be given to iterate over a subset of the symbol; in that case the
+    number of records is not known upfront and the arrays grow as needed. The values are stored as dtype; with texts
+    the explicit texts of the records are read as well. specials and fillna are applied to every block with
+    map_specials, in float64 before the values are cast to dtype. Without specials a float32 dtype turns EPS into 0
+    and UNDF into inf.
+    """
+    if uels is None:
+        uels = UelTable()
+    dimension = symbol.dimension
+    n_attributes = len(attributes)
+    get_values = attrgetter(*attributes) if n_attributes else None
+    code_of = uels.codes.get
+    add_uel = uels.add
+
+    if records is None:
+        records = symbol
+        capacity = symbol.number_records
+    else:
+        capacity = 1024
+    if chunksize is not None:
+        capacity = min(capacity, chunksize)
+    capacity = max(capacity, 1)
+
+    mapped = bool(specials) or fillna is not None
+    eps = workspace_eps(symbol.database) if specials else None
+    if mapped:
+        # special values only survive in float64, the values are cast to dtype after mapping
+        dtype, block_dtype = np.float64, dtype
+    codes = np.empty((capacity, dimension), dtype=np.int32)
+    values = np.empty((capacity, n_attributes), dtype=dtype)
+    text_values = np.empty(capacity if texts else 0, dtype=object)
+    i = 0
+    yielded = False
+    for record in records:
+        if i == capacity:
+            if chunksize is not None and i == chunksize:
+                if mapped:
+                    values = map_specials(values, specials, fillna, eps).astype(block_dtype, copy=False)
+                yield ColumnBlock(codes, values, uels, text_values if texts else None)
+                yielded = True
+                codes = np.empty((capacity, dimension), dtype=np.int32)
+                values = np.empty((capacity, n_attributes), dtype=dtype)
+                text_values = np.empty(capacity if texts else 0, dtype=object)
+                i = 0
+            else:
+                capacity = capacity * 2 if chunksize is None else min(capacity * 2, chunksize)
+                codes = np.resize(codes, (capacity, dimension))
+                values = np.resize(values, (capacity, n_attributes))
+                if texts:
+                    text_values = np.resize(text_values, capacity)
+        codes[i] = [code_of(key) or add_uel(key) for key in record.keys]
+        if n_attributes == 1:
+            values[i, 0] = get_values(record)
+        elif n_attributes:
+            values[i] = get_values(record)
+        if texts:
+            text_values[i] = record.text
+        i += 1
+    if i or not yielded:
+        values = values[:i]
+        if mapped:
+            values = map_specials(values, specials, fillna, eps).astype(block_dtype, copy=False)
+        yield ColumnBlock(codes[:i], values, uels, text_values[:i] if texts else None)
+
+
+def extract_block(symbol, attributes=(), records=None, uels=None):
+    return next(iter_blocks(symbol, attributes, records=records, uels=uels))
+
+
+AGGREGATE_FUNCS = ["sum", "mean", "max", "min"]
+
+
+def aggregate_blocks(blocks, keep, func="sum"):
+    """
+    Reduce the values of a stream of ColumnBlocks over all dimensions that are not in keep (a list of positions).
+    Every block is reduced as soon as it is read and merged into an accumulator with one row per combination of the
+    kept codes, so memory scales with the result and the size of one block. Returns a single ColumnBlock.
+    """
+    if func not in AGGREGATE_FUNCS:
+        raise GamsAddOnException("aggregate func %s not defined, use one of %s" % (func, AGGREGATE_FUNCS))
+    codes = values = counts = uels = None
+    for block in blocks:
+        uels = block.uels
+        block_codes, block_values, block_counts = __reduce(block.codes[:, keep], block.values,
+                                                           np.ones(len(block)), func)
+        if codes is not None:
+            block_codes, block_values, block_counts = __reduce(np.vstack([codes, block_codes]),
+                                                               np.vstack([values, block_values]),
+                                                               np.concatenate([counts, block_counts]), func)
+        codes, values, counts = block_codes, block_values, block_counts
+    if func == "mean":
+        values = values / counts[:, np.newaxis]
+    return ColumnBlock(codes, values, uels)
+
+
+def __reduce(codes, values, counts, func):
+    if codes.shape[1]:
+        codes, inverse = np.unique(codes, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+    else:
+        codes = codes[:1]
+        inverse = np.zeros(len(values), dtype=np.int64)
+    n = len(codes)
+    reduced = np.empty((n, values.shape[1]), dtype=np.float64)
+    for j in range(values.shape[1]):
+        if func in ["sum", "mean"]:
+            reduced[:, j] = np.bincount(inverse, weights=values[:, j], minlength=n)
+        elif func == "max":
+            reduced[:, j] = -np.inf
+            np.maximum.at(reduced[:, j], inverse, values[:, j])
+        else:
+            reduced[:, j] = np.inf
+            np.minimum.at(reduced[:, j], inverse, values[:, j])
+    return codes, reduced, np.bincount(inverse, weights=counts, minlength=n)
+
+
+def filter_records(symbol, names, filters):
+    """
+    Iterate over the records of a symbol whose keys match filters, a dict from domain name (or position) to the
+    allowed labels. When the leading dimensions are filtered, the matching blocks of records are looked up with
+    first_record(slice) instead of scanning the whole symbol. Returns None when there is nothing to filter.
+    Note that the same record object may be reused for every yielded record.
+    """
+    if not filters:
+        return None
+    allowed = [None] * symbol.dimension
+    for name, labels in filters.items():
+        if isinstance(name, int):
+            position = name
+        elif name in names:
+            position = names.index(name)
+        else:
+            raise GamsAddOnException("Cannot filter %s on %s, the domains are %s" % (symbol.name, name, names))
+        if isinstance(labels, (str, int)):
+            labels = [labels]
+        allowed[position] = set(str(label) for label in labels)
+
+    prefix = 0
+    while prefix < symbol.dimension and allowed[prefix] is not None:
+        prefix += 1
+    checks = [(d, allowed[d]) for d in range(prefix, symbol.dimension) if allowed[d] is not None]
+
+    n_slices = 1
+    for d in range(prefix):
+        n_slices *= len(allowed[d])
+    if prefix == 0 or n_slices > symbol.number_records:
+        checks = [(d, labels) for d, labels in enumerate(allowed) if labels is not None]
+        return (record for record in symbol if all(record.keys[d] in labels for d, labels in checks))
+    return __iter_slices(symbol, [sorted(allowed[d]) for d in range(prefix)], checks)
+
+
+def __iter_slices(symbol, prefix_labels, checks):
+    prefix = len(prefix_labels)
+    free = [""] * (symbol.dimension - prefix)
+    for labels in product(*prefix_labels):
+        labels = list(labels)
+        try:
+            record = symbol.first_record(labels + free)
+        except gams.GamsException:
+            continue
+        # records are sorted, so all records of this slice follow each other
+        while True:
+            keys = record.keys
+            if keys[:prefix] != labels:
+                break
+            if all(keys[d] in allowed for d, allowed in checks):
+                yield record
+            if not record.move_next():
+                break
+
+
+def index_names(symbol):
+    """
+    Index names of the frame of a symbol: its domains, with Dim<d> for a dimension over the universe. A 1-dim set
+    over the universe is named after the set itself.
+    """
+    domains = symbol.domains_as_strings
+    if type(symbol) == gams.GamsSet and domains == ["*"]:
+        return [symbol.name]
+    return ["Dim%d" % (d + 1) if domain == "*" else domain for d, domain in enumerate(domains)]
+
+
+def build_index(codes, uels, names):
+    """
+    Build a MultiIndex from a matrix of UEL codes. Each level only contains the labels that are used in that
+    dimension, in UEL order.
+    """
+    labels = uels.as_array()
+    levels = list()
+    level_codes = list()
+    for d in range(codes.shape[1]):
+        column = codes[:, d]
+        used = np.zeros(len(labels), dtype=bool)
+        used[column] = True
+        levels.append(pd.Index(labels[used], dtype=object))
+        level_codes.append((np.cumsum(used) - 1)[column])
+    return pd.MultiIndex(levels=levels, codes=level_codes, names=names, verify_integrity=False)
+
+
+def block_to_frame(block, names, columns, values=None):
+    index = build_index(block.codes, block.uels, names)
+    if values is None:
+        values = block.values
+    return pd.DataFrame(values, index=index, columns=columns)
+
+
+INDEX_DTYPES = ["int", "int32", "str", "category"]
+
+
+def cast_level(level, index_dtype="int", uels=None, castable=None):
+    """
+    Convert the unique labels of one index level. With "int" the labels are cast to integers when all of them are
+    integers and left untouched otherwise; "int32" does the same when all integers fit in 32 bits. castable overrides
+    that decision, e.g. to cast all chunks of a symbol the same way (see int_castable). With "category" and a
+    UelTable, the categories are all labels of the table.
+    """
+    if index_dtype in ["int", "int32"]:
+        if castable is not None:
+            return level.astype(np.int32 if index_dtype == "int32" else np.int64) if castable else level
+        try:
+            cast = level.astype(np.int64)
+        except (ValueError, TypeError, OverflowError):
+            return level
+        if not cast.is_unique:
+            return level
+        if index_dtype == "int32":
+            info = np.iinfo(np.int32)
+            if len(cast) and (cast.min() < info.min or cast.max() > info.max):
+                return level
+            return cast.astype(np.int32)
+        return cast
+    elif index_dtype == "str":
+        return level
+    elif index_dtype == "category":
+        if uels is not None:
+            return pd.CategoricalIndex(level, dtype=uels.dtype())
+        return pd.CategoricalIndex(level, categories=level)
+    raise GamsAddOnException("index_dtype %s not defined, use one of %s" % (index_dtype, INDEX_DTYPES))
+
+
+def int_castable(labels, index_dtype="int"):
+    """
+    True when cast_level casts a level with these labels to integers.
+    """
+    level = pd.Index(list(labels), dtype=object)
+    return cast_level(level, index_dtype).dtype != object
+
+
+def cast_index(index, index_dtype="int", uels=None, castable=None):
+    """
+    Convert the levels of a MultiIndex without touching its codes, so the cost only depends on the number of unique
+    labels. A MultiIndex with a single level is returned as a flat Index. castable is None or one decision per level
+    for cast_level.
+    """
+    if castable is None:
+        castable = [None] * index.nlevels
+    levels = [cast_level(level, index_dtype, uels, c) for level, c in zip(index.levels, castable)]
+    if index.nlevels == 1:
+        return levels[0].take(index.codes[0]).rename(index.names[0])
+    return pd.MultiIndex(levels=levels, codes=index.codes, names=index.names, verify_integrity=False)
+
+
+def object_levels(index):
+    """
+    Convert string levels back to object dtype. Frames read back from Arrow have pandas string levels, extracted
+    frames have object levels. Numeric and categorical levels are left as they are.
+    """
+    def convert(level):
+        if level.dtype != object and pd.api.types.is_string_dtype(level.dtype):
+            return level.astype(object)
+        return level
+
+    if isinstance(index, pd.MultiIndex):
+        return pd.MultiIndex(levels=[convert(level) for level in index.levels], codes=index.codes, names=index.names,
+                             verify_integrity=False)
+    return convert(index)
@@ -1,33 +1,263 @@
 __author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
 
 import gams
+import numpy as np
+import pandas as pd
 
+from .columnar import VAR_EQU_ATTRIBUTES, unmap_specials, workspace_eps
+from .gams_add_on_exception import GamsAddOnException
+from .gdx_to_df import db_to_df
+from .instrumentation import stage
 
-def add_df_to_db(df, name, db, gams_type, result_type='L'):
-    if gams_type == gams.GamsParameter:
-        print("Add parameter from GamsDatabase")
-        try:
-            param = db.get_parameter(name)
-
-            col_name = df.columns[0]
-            if "Type" in df.index.names:
-                index_cols = df.index.names
-                df = df.reset_index()
-                df = df[df["Type"] == result_type].set_index(index_cols)
-
-                for idx in df.index:
-                    gams_idx = [str(i) for i in idx[:-1]]
-                    param.add_record(gams_idx).value = float(df.loc[idx, col_name])
+
+def add_df_to_db(df, name, db, gams_type, result_type='L', text="", specials=None):
+    """
+    Write a DataFrame (as returned by gdx_to_df) into symbol name of a GamsDatabase. The symbol is created when it
+    does not exist yet, using the index names as domains where they are sets of the database.
+
+    gams_type is one of gams.GamsParameter, gams.GamsVariable, gams.GamsEquation or gams.GamsSet. For variables and
+    equations the columns may be attributes (L, M, LO, UP, SCALE), otherwise the first column is written to the
+    attribute result_type. A scalar variable or equation is written from a Series indexed by attribute names, as
+    gdx_to_df returns it for gams_type "all". For sets, a boolean column selects the members and a text column
+    (gdx_to_df with text=True) holds their explicit texts; any other column is written as explicit text.
+
+    specials is the mapping that was used to extract df (e.g. {"EPS": 0.0, "NA": np.nan}); values equal to a mapped
+    value are written back as the GAMS special value. Every special value must be mapped to a different value. Note
+    that with {"EPS": 0.0} every 0 written to a variable or equation (level, marginal or bounds) becomes EPS.
+    """
+    with stage("add_df_to_db", name) as timing:
+        db = __add_df_to_db(df, name, db, gams_type, result_type, text, specials)
+        timing.done(getattr(df, "shape", [1])[0], df)
+    return db
+
+
+def update_db_from_df(db, name, df, mode="upsert", gams_type=gams.GamsParameter, result_type='L'):
+    """
+    Bring symbol name of a GamsDatabase in line with df by only touching the records that differ. The keys of df are
+    matched with the current records in one vectorized lookup.
+
+    mode is one of
+        "upsert": add the new records and update the changed ones,
+        "replace": only update the records that already exist,
+        "delete_missing": as upsert, and delete the records that are not in df.
+
+    gams_type is only used when the symbol does not exist yet. Returns the number of inserted, updated and deleted
+    records.
+    """
+    if mode not in ["upsert", "replace", "delete_missing"]:
+        raise GamsAddOnException("mode %s not defined" % mode)
+    try:
+        symbol = db.get_symbol(name)
+    except gams.GamsException:
+        symbol = None
+    if symbol is None:
+        if mode == "replace":
+            raise GamsAddOnException("Symbol %s does not exist" % name)
+        add_df_to_db(df, name, db, gams_type, result_type)
+        return {"inserted": getattr(df, "shape", [1])[0], "updated": 0, "deleted": 0}
+    gams_type = type(symbol)
+    if not isinstance(df, (pd.DataFrame, pd.Series)):
+        # scalar
+        add_df_to_db(df, name, db, gams_type, result_type)
+        return {"inserted": 0, "updated": 1, "deleted": 0}
+
+    with stage("update_db_from_df", name) as timing:
+        if isinstance(df, pd.Series):
+            df = df.to_frame()
+        if "Type" in df.index.names:
+            df = df.xs(result_type, level="Type")
+
+        if gams_type == gams.GamsSet:
+            attributes = []
+            gams_types = "L"
+        elif gams_type == gams.GamsParameter:
+            attributes = ["value"]
+            gams_types = "L"
+        else:
+            columns = [str(col).upper() for col in df.columns]
+            if all(col in VAR_EQU_ATTRIBUTES for col in columns):
+                attributes = [VAR_EQU_ATTRIBUTES[col] for col in columns]
+                gams_types = columns
             else:
-                for idx in df.index:
-                    gams_idx = [str(i) for i in idx]
-                    param.add_record(gams_idx).value = float(df.loc[idx, col_name])
+                attributes = [__attribute(result_type)]
+                gams_types = result_type
+        if gams_type == gams.GamsSet and len(df.columns) and df.dtypes.iloc[0] == bool:
+            df = df[df.iloc[:, 0].to_numpy()]
+
+        current = db_to_df(db, name, gams_type=gams_types, index_dtype="str")
+        new_index = __str_index(df.index)
+        if len(current):
+            position = __str_index(current.index).get_indexer(new_index)
+        else:
+            position = np.full(len(df), -1, dtype=np.int64)
+        exists = position >= 0
+
+        update = np.zeros(len(df), dtype=bool)
+        if attributes:
+            new_values = df.iloc[:, :len(attributes)].to_numpy(dtype=np.float64)
+            old_values = current.to_numpy(dtype=np.float64)[position[exists]]
+            same = (old_values == new_values[exists]) | (np.isnan(old_values) & np.isnan(new_values[exists]))
+            update[exists] = ~same.all(axis=1)
+
+        insert = ~exists if mode != "replace" else np.zeros(len(df), dtype=bool)
+        delete = np.zeros(len(current), dtype=bool)
+        if mode == "delete_missing":
+            delete[:] = True
+            delete[position[exists]] = False
+
+        for key, row in zip(__index_to_keys(df.index[update]), new_values[update].tolist() if attributes else []):
+            record = symbol.find_record(key)
+            for attribute, value in zip(attributes, row):
+                setattr(record, attribute, value)
+        inserted = __index_to_keys(df.index[insert])
+        insert_values = new_values[insert].tolist() if attributes else [[]] * len(inserted)
+        for key, row in zip(inserted, insert_values):
+            record = symbol.add_record(key)
+            for attribute, value in zip(attributes, row):
+                setattr(record, attribute, value)
+        for key in __index_to_keys(current.index[delete]):
+            symbol.delete_record(key)
+
+        counts = {"inserted": int(insert.sum()), "updated": int(update.sum()), "deleted": int(delete.sum())}
+        timing.done(sum(counts.values()))
+    return counts
+
+
+def __str_index(index):
+    if isinstance(index, pd.MultiIndex):
+        levels = [level.astype(str) for level in index.levels]
+        return pd.MultiIndex(levels=levels, codes=index.codes, names=index.names, verify_integrity=False)
+    return index.astype(str)
+
+
+def __add_df_to_db(df, name, db, gams_type, result_type='L', text="", specials=None):
+    if gams_type not in [gams.GamsParameter, gams.GamsVariable, gams.GamsEquation, gams.GamsSet]:
+        raise GamsAddOnException("Not yet implemented: Add Symbol of type: %s" % gams_type)
 
-        except gams.GamsException as e:
-            print(e)
-            exit("Not yet implemented: Create new %s in db" % gams_type)
+    if isinstance(df, pd.DataFrame) and "Type" in df.index.names:
+        df = df.xs(result_type, level="Type")
+    eps = workspace_eps(db) if specials else None
+
+    if gams_type in [gams.GamsVariable, gams.GamsEquation] and __is_scalar_series(db, name, df):
+        # scalar variable or equation: a Series from attribute name to value (gdx_to_df with gams_type "all")
+        symbol = __get_or_add_symbol(db, name, gams_type, None, text)
+        put_record = symbol.add_record if symbol.number_records == 0 else symbol.merge_record
+        record = put_record()
+        attributes = [__attribute(str(attribute)) for attribute in df.index]
+        values = unmap_specials(df.to_numpy(dtype=np.float64, copy=True), specials, eps)
+        for attribute, value in zip(attributes, values.tolist()):
+            setattr(record, attribute, value)
+        return db
+
+    symbol = __get_or_add_symbol(db, name, gams_type, df, text)
+    # records are only looked up when there is existing data to merge into
+    put_record = symbol.add_record if symbol.number_records == 0 else symbol.merge_record
+
+    if not isinstance(df, (pd.DataFrame, pd.Series)):
+        # scalar
+        record = put_record()
+        value = float(unmap_specials(np.array([float(df)]), specials, eps)[0])
+        if gams_type == gams.GamsParameter:
+            record.value = value
+        elif gams_type != gams.GamsSet:
+            setattr(record, __attribute(result_type), value)
+        return db
+
+    if isinstance(df, pd.Series):
+        df = df.to_frame()
+    keys = __index_to_keys(df.index)
+
+    if gams_type == gams.GamsParameter:
+        values = unmap_specials(df.iloc[:, 0].to_numpy(dtype=np.float64, copy=True), specials, eps)
+        for key, value in zip(keys, values.tolist()):
+            put_record(key).value = value
+
+    elif gams_type == gams.GamsSet:
+        column = df.iloc[:, 0] if len(df.columns) else None
+        if column is None or column.dtype == bool:
+            # the text column of gdx_to_df with text=True holds the explicit texts of the members
+            texts = df["text"].astype(str).tolist() if "text" in df.columns else [None] * len(keys)
+            members = column.to_numpy().tolist() if column is not None else [True] * len(keys)
+            for key, member, element_text in zip(keys, members, texts):
+                if member:
+                    record = put_record(key)
+                    if element_text:
+                        record.text = element_text
+        else:
+            for key, element_text in zip(keys, column.astype(str).tolist()):
+                put_record(key).text = element_text
 
     else:
-        exit("Not yet implemented: Add Symbol of type: %s" % gams_type)
+        columns = [str(col).upper() for col in df.columns]
+        if all(col in VAR_EQU_ATTRIBUTES for col in columns):
+            attributes = [VAR_EQU_ATTRIBUTES[col] for col in columns]
+            values = df.to_numpy(dtype=np.float64, copy=True)
+        else:
+            attributes = [__attribute(result_type)]
+            values = df.iloc[:, [0]].to_numpy(dtype=np.float64, copy=True)
+        values = unmap_specials(values, specials, eps)
+        for key, row in zip(keys, values.tolist()):
+            record = put_record(key)
+            for attribute, value in zip(attributes, row):
+                setattr(record, attribute, value)
 
     return db
+
+
+def __attribute(result_type):
+    attribute = VAR_EQU_ATTRIBUTES.get(result_type.upper())
+    if attribute is None:
+        raise GamsAddOnException("result_type %s not defined" % result_type)
+    return attribute
+
+
+def __is_scalar_series(db, name, df):
+    if not isinstance(df, pd.Series) or isinstance(df.index, pd.MultiIndex):
+        return False
+    try:
+        return db.get_symbol(name).dimension == 0
+    except gams.GamsException:
+        return len(df) > 0 and all(str(attribute).upper() in VAR_EQU_ATTRIBUTES for attribute in df.index)
+
+
+def __index_to_keys(index):
+    """
+    Convert the index into one list of string keys per row. Labels are converted to strings once per level.
+    """
+    if isinstance(index, pd.MultiIndex):
+        columns = [np.asarray(level.astype(str), dtype=object)[codes]
+                   for level, codes in zip(index.levels, index.codes)]
+        return [list(key) for key in zip(*columns)]
+    return index.astype(str).tolist()
+
+
+def __get_or_add_symbol(db, name, gams_type, df, text):
+    try:
+        symbol = db.get_symbol(name)
+    except gams.GamsException:
+        symbol = None
+    if symbol is not None:
+        if type(symbol) != gams_type:
+            raise GamsAddOnException("Symbol %s is a %s, not a %s" % (name, type(symbol).__name__,
+                                                                       gams_type.__name__))
+        return symbol
+
+    if isinstance(df, (pd.DataFrame, pd.Series)):
+        domains = [__domain(db, index_name) for index_name in df.index.names]
+    else:
+        domains = []
+    if gams_type == gams.GamsParameter:
+        return db.add_parameter_dc(name, domains, text)
+    elif gams_type == gams.GamsVariable:
+        return db.add_variable_dc(name, gams.VarType.Free, domains, text)
+    elif gams_type == gams.GamsEquation:
+        return db.add_equation_dc(name, gams.EquType.E, domains, text)
+    return db.add_set_dc(name, domains, text)
+
+
+def __domain(db, index_name):
+    try:
+        symbol = db.get_symbol(str(index_name))
+    except gams.GamsException:
+        return "*"
+    return symbol if type(symbol) == gams.GamsSet else "*"
@@ -1,72 +1,27 @@
 __author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
 __date__ = "26/06/2017"
-import subprocess
-import sys
+import os
 
-from .gams_add_on_exception import GamsAddOnException
+from .gdx_api import GdxHandle
 
 
 class DomainInfo(object):
-    def __init__(self, gdx_file):
+    def __init__(self, gdx_file, system_directory=None):
         gdx_file = gdx_file.replace('\\', '/')
         self.gdx_file = gdx_file
         self.symbols = dict()
         self.alias = dict()
-        if sys.platform in ['linux2', 'darwin']:
-            proc = subprocess.Popen(['gdxdump %s Symbols' % gdx_file, ""],
-                                    stdout=subprocess.PIPE, shell=True,
-                                    stderr=subprocess.STDOUT)
-        elif sys.platform in ['win32']:
-            cmd = ['gdxdump', '%s' % gdx_file, 'Symbols', '']
-            # print " ".join(cmd)
-            proc = subprocess.Popen(cmd,
-                                    stdout=subprocess.PIPE, shell=True,
-                                    stderr=subprocess.STDOUT)
-        else:
-            raise GamsAddOnException('ERROR {platform} not handled'.format(platform=sys.platform))
-        (out, err) = proc.communicate()
-        out = out.decode("latin-1")
-        if "GDX file not found" in out:
-            msg = out.replace('\n', ' ')
-            raise IOError(msg)
-        for l, line in enumerate(out.split('\n')):
-            info = [l for l in line.strip().split(' ') if l is not '']
-
-            if info and info[3] == 'Alias':
-                self.alias[info[1]] = info[-1]
-
-        if sys.platform in ['linux2', 'darwin']:
-            proc = subprocess.Popen(["gdxdump \"%s\" DomainInfo" % gdx_file, ""], stdout=subprocess.PIPE, shell=True,
-                                    stderr=subprocess.STDOUT)
-        elif sys.platform in ['win32']:
-            proc = subprocess.Popen(['gdxdump', '%s' % gdx_file, 'DomainInfo', ''], stdout=subprocess.PIPE,
-                                    shell=True,
-                                    stderr=subprocess.STDOUT)
-        else:
-            raise GamsAddOnException('ERROR {platform} not handled'.format(platform=sys.platform))
-        (out, err) = proc.communicate()
-        out = out.decode("latin-1")
-        # print out, err
-        for l, line in enumerate(out.split('\n')):
-            try:
-                sets = [s.strip() for s in line[line.index('(') + 1: line.index(')')].split(',')]
-            except ValueError:
-                sets = None
-                pass
-            line = [l for l in line.strip().split(' ') if l is not '']
-            if line and line[1] in ['Set', 'Par', 'Var', 'Equ']:
-                name = line[3].split('(')[0]
-                # print name, sets
-                self.symbols[name] = (line[1], sets, None)
-            elif line and line[1] in ['Alias']:
-                name = line[3].split('(')[0]
-                sets = None
-                self.symbols[name] = (line[1], sets, self.alias[name])
-            else:
-                # print line
-                pass
-
-                # print "program output:", out
+        if not os.path.isfile(gdx_file):
+            raise IOError("GDX file not found: %s" % gdx_file)
+
+        # read the symbol table in process through the gdx API, no records are read
+        with GdxHandle(gdx_file, system_directory) as gdx:
+            for info in gdx.symbols():
+                if info.type == "Alias":
+                    self.alias[info.name] = info.alias_of
+                    self.symbols[info.name] = (info.type, None, info.alias_of)
+                else:
+                    self.symbols[info.name] = (info.type, info.domains, None)
 
     def get_sets(self, symbol):
         if symbol in self.symbols:
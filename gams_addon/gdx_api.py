@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+from collections import namedtuple
+
+try:
+    import gdxcc
+except ImportError:  # newer GAMS versions ship the low level APIs inside the gams package
+    from gams.core import gdx as gdxcc
+
+from .gams_add_on_exception import GamsAddOnException
+from .workspace import get_workspace
+
+SYMBOL_TYPES = {
+    gdxcc.GMS_DT_SET: "Set",
+    gdxcc.GMS_DT_PAR: "Par",
+    gdxcc.GMS_DT_VAR: "Var",
+    gdxcc.GMS_DT_EQU: "Equ",
+    gdxcc.GMS_DT_ALIAS: "Alias",
+}
+
+SymbolInfo = namedtuple("SymbolInfo", ["number", "name", "type", "dimension", "domains", "records", "text",
+                                       "alias_of"])
+
+
+class GdxHandle(object):
+    """
+    Opens a gdx file for reading through the gdx C API. Only the symbol table and the UELs are read, no records.
+
+        with GdxHandle(gdx_file) as gdx:
+            for info in gdx.symbols():
+                ...
+    """
+
+    def __init__(self, gdx_file, system_directory=None):
+        self.gdx_file = gdx_file
+        self.system_directory = system_directory
+        self._handle = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        system_directory = self.system_directory
+        if system_directory is None:
+            system_directory = get_workspace().system_directory
+        handle = gdxcc.new_gdxHandle_tp()
+        rc, msg = gdxcc.gdxCreateD(handle, system_directory, gdxcc.GMS_SSSIZE)
+        if not rc:
+            raise GamsAddOnException("Could not load the gdx library: %s" % msg)
+        rc, error_nr = gdxcc.gdxOpenRead(handle, self.gdx_file)
+        if not rc:
+            msg = gdxcc.gdxErrorStr(handle, error_nr)[1]
+            gdxcc.gdxFree(handle)
+            raise IOError("Could not open gdx file %s: %s" % (self.gdx_file, msg))
+        self._handle = handle
+
+    def close(self):
+        if self._handle is not None:
+            gdxcc.gdxClose(self._handle)
+            gdxcc.gdxFree(self._handle)
+            self._handle = None
+
+    @property
+    def handle(self):
+        if self._handle is None:
+            raise GamsAddOnException("gdx file %s is not opened" % self.gdx_file)
+        return self._handle
+
+    def number_symbols(self):
+        return gdxcc.gdxSystemInfo(self.handle)[1]
+
+    def number_uels(self):
+        return gdxcc.gdxSystemInfo(self.handle)[2]
+
+    def symbol_name(self, number):
+        if number == 0:
+            return "*"
+        return gdxcc.gdxSymbolInfo(self.handle, number)[1]
+
+    def symbol_info(self, number):
+        _, name, dimension, symbol_type = gdxcc.gdxSymbolInfo(self.handle, number)
+        _, records, user_info, text = gdxcc.gdxSymbolInfoX(self.handle, number)
+        alias_of = None
+        domains = None
+        if symbol_type == gdxcc.GMS_DT_ALIAS:
+            # for an alias the user info holds the number of the aliased set, 0 is the universe
+            alias_of = self.symbol_name(user_info)
+        elif dimension > 0:
+            domains = list(gdxcc.gdxSymbolGetDomainX(self.handle, number)[1][:dimension])
+        return SymbolInfo(number, name, SYMBOL_TYPES.get(symbol_type, symbol_type), dimension, domains, records, text,
+                          alias_of)
+
+    def symbols(self):
+        for number in range(1, self.number_symbols() + 1):
+            yield self.symbol_info(number)
+
+    def find_symbol(self, name):
+        rc, number = gdxcc.gdxFindSymbol(self.handle, name)
+        if not rc:
+            raise GamsAddOnException("Symbol %s not found in %s" % (name, self.gdx_file))
+        return self.symbol_info(number)
+
+    def uels(self):
+        """
+        All unique element labels of the file, in gdx order (the label of UEL number n is at position n - 1).
+        """
+        return [gdxcc.gdxUMUelGet(self.handle, n)[1] for n in range(1, self.number_uels() + 1)]
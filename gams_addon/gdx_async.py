@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .gdx_to_df import gdx_to_df
+
+MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+# (gdx file, symbol, arguments) -> concurrent future of the running extraction, removed when the extraction is done
+_in_flight = dict()
+_in_flight_lock = threading.Lock()
+
+def get_executor():
+    """
+    The bounded thread pool that runs the extractions of agdx_to_df. Every worker thread keeps its own GamsWorkspace.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="gams_addon")
+        return _executor
+
+
+def set_max_workers(max_workers):
+    """
+    Replace the thread pool by one with max_workers threads; running extractions finish on the old pool.
+    """
+    global _executor, MAX_WORKERS
+    with _executor_lock:
+        MAX_WORKERS = max_workers
+        old, _executor = _executor, None
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+async def agdx_to_df(gdx_file, symbol, timeout=None, **kwargs):
+    """
+    Same as gdx_to_df, but runs the extraction on the thread pool of get_executor so the event loop is not blocked.
+
+    Concurrent calls for the same gdx file, symbol and arguments, also from different event loops, share one
+    extraction and get the same DataFrame, so copy it before changing it. With timeout (in seconds)
+    asyncio.TimeoutError is raised when the extraction takes longer. A timeout or cancellation only stops the waiting
+    caller: the extraction itself can not be interrupted and keeps running for the other callers.
+    """
+    loop = asyncio.get_running_loop()
+    key = (os.path.abspath(gdx_file), symbol, repr(sorted(kwargs.items())))
+    executor = get_executor()
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        started = future is None
+        if started:
+            future = executor.submit(gdx_to_df, gdx_file, symbol, **kwargs)
+            _in_flight[key] = future
+    if started:
+        # runs in the worker thread, so the entry is removed even when no event loop waits for it any more
+        future.add_done_callback(functools.partial(_remove_in_flight, key))
+    # every caller waits on its own asyncio future, shielded so a timeout does not cancel the shared extraction
+    return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future, loop=loop)), timeout)
+
+
+def _remove_in_flight(key, future):
+    with _in_flight_lock:
+        if _in_flight.get(key) is future:
+            del _in_flight[key]
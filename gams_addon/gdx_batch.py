@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+import os
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    pa = None
+
+from .columnar import cast_level, object_levels
+from .gams_add_on_exception import GamsAddOnException
+from .gdx_to_df import db_to_df
+from .workspace import get_workspace
+
+
+def gdx_to_df_many(files, symbols, workers=None, progress=None, level_name="scenario", **kwargs):
+    """
+    Read the same symbols from many gdx files in a pool of worker processes, every process using its own
+    GamsWorkspace. files is a list of paths (the scenario name is the file name without extension) or a dict from
+    scenario name to path. The keyword arguments are passed to db_to_df.
+
+    Returns a dict from symbol to the frames of all files concatenated with an extra index level level_name (a Series
+    for scalars), and a dict from scenario to the exception of every file that failed. progress, when given, is called
+    as progress(done, total, scenario) after every file.
+
+    When pyarrow is installed the workers hand their frames back as Arrow IPC files that are read memory mapped,
+    instead of pickling them.
+    """
+    if isinstance(files, dict):
+        scenarios = list(files.items())
+    else:
+        scenarios = [(os.path.splitext(os.path.basename(f))[0], f) for f in files]
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    # the index is cast once on the concatenated frames, so a label level is cast the same way for all files
+    index_dtype = kwargs.get("index_dtype", "int")
+    kwargs = dict(kwargs, index_dtype="str")
+
+    tmp_dir = tempfile.mkdtemp(prefix="gams_addon_") if pa is not None else None
+    results = dict()
+    failures = dict()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = dict()
+            for scenario, gdx_file in scenarios:
+                futures[pool.submit(_extract_file, gdx_file, symbols, tmp_dir, kwargs)] = scenario
+            for done, future in enumerate(as_completed(futures), 1):
+                scenario = futures[future]
+                try:
+                    results[scenario] = dict((symbol, _load_frame(frame))
+                                             for symbol, frame in future.result().items())
+                except Exception as e:
+                    failures[scenario] = e
+                if progress is not None:
+                    progress(done, len(scenarios), scenario)
+
+        frames = dict()
+        names = [scenario for scenario, _ in scenarios if scenario in results]
+        for symbol in symbols:
+            frames[symbol] = _concat([results[scenario][symbol] for scenario in names], names, symbol, level_name,
+                                     index_dtype, kwargs.get("uels"))
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return frames, failures
+
+
+def _extract_file(gdx_file, symbols, tmp_dir, kwargs):
+    try:
+        db = get_workspace().add_database_from_gdx(gdx_file)
+        frames = dict()
+        for symbol in symbols:
+            df = db_to_df(db, symbol, **kwargs)
+            if tmp_dir is not None and isinstance(df, pd.DataFrame):
+                path = os.path.join(tmp_dir, "%s.arrow" % uuid.uuid4().hex)
+                feather.write_feather(pa.Table.from_pandas(df), path, compression="uncompressed")
+                df = path
+            frames[symbol] = df
+        return frames
+    except Exception as e:
+        # gams exceptions can not always be pickled back to the parent process
+        raise GamsAddOnException("%s: %s" % (gdx_file, e))
+
+
+def _load_frame(frame):
+    if isinstance(frame, str):
+        return feather.read_table(frame, memory_map=True).to_pandas()
+    return frame
+
+
+def _concat(frames, names, symbol, level_name, index_dtype="int", uels=None):
+    if not frames:
+        return None
+    if all(isinstance(df, pd.DataFrame) for df in frames):
+        df = pd.concat(frames, keys=names, names=[level_name])
+        # frames handed back through Arrow have string levels, extracted frames object levels
+        index = object_levels(df.index)
+        # the scenario level is left as is
+        levels = [index.levels[0]] + [cast_level(level, index_dtype, uels) for level in index.levels[1:]]
+        df.index = pd.MultiIndex(levels=levels, codes=index.codes, names=index.names, verify_integrity=False)
+        return df
+    if all(isinstance(df, (pd.DataFrame, pd.Series)) for df in frames):
+        return pd.concat(frames, keys=names, names=[level_name])
+    series = pd.Series(frames, index=names, name=symbol)
+    series.index.name = level_name
+    return series
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    pa = None
+
+from .columnar import object_levels
+from .gams_add_on_exception import GamsAddOnException
+
+# keyword arguments of gdx_to_df that do not change the extracted frame
+IGNORED_KWARGS = ["domain_info", "uels"]
+SCALAR_COLUMN = "__scalar__"
+
+
+class GdxCache(object):
+    """
+    On-disk cache of extracted symbols. Every entry is an uncompressed Feather file that is read back memory mapped.
+    Entries are keyed by the path, modification time, size and content hash of the gdx file, the symbol and the
+    extraction arguments. With max_size (in bytes) the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir, max_size=None):
+        if pa is None:
+            raise GamsAddOnException("The gdx cache needs pyarrow, install it with: pip install pyarrow")
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+    def load(self, gdx_file, symbol, kwargs):
+        path = self.__entry_path(gdx_file, symbol, kwargs)
+        if not os.path.isfile(path):
+            return None
+        try:
+            df = feather.read_table(path, memory_map=True).to_pandas()
+            os.utime(path, None)
+        except (IOError, OSError, pa.ArrowException):
+            # the entry was evicted or is being replaced by another process
+            return None
+        if list(df.columns) == [SCALAR_COLUMN]:
+            return float(df[SCALAR_COLUMN].iloc[0])
+        # same index dtypes as the extracted frame
+        df.index = object_levels(df.index)
+        return df
+
+    def store(self, gdx_file, symbol, kwargs, df):
+        if isinstance(df, float):
+            df = pd.DataFrame({SCALAR_COLUMN: [df]})
+        elif not isinstance(df, pd.DataFrame):
+            return df
+        path = self.__entry_path(gdx_file, symbol, kwargs)
+        # a unique hidden file, so concurrent writers never share it and the globs of the cache skip it
+        fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=self.cache_dir)
+        os.close(fd)
+        try:
+            feather.write_feather(pa.Table.from_pandas(df), tmp_path, compression="uncompressed")
+            os.replace(tmp_path, path)
+        except BaseException:
+            self.__remove(tmp_path)
+            raise
+        if self.max_size is not None:
+            self.evict(self.max_size)
+
+    def evict(self, max_size):
+        """
+        Remove the least recently used entries until the cache is at most max_size bytes.
+        """
+        entries = list()
+        for path in glob.glob(os.path.join(self.cache_dir, "*.feather")):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_size:
+                break
+            self.__remove(path)
+            total -= size
+
+    def invalidate(self, gdx_file=None):
+        """
+        Remove all entries of gdx_file, or the whole cache when gdx_file is None.
+        """
+        prefix = "*" if gdx_file is None else self.__file_key(gdx_file)
+        for path in glob.glob(os.path.join(self.cache_dir, prefix + "_*")):
+            self.__remove(path)
+
+    def clear(self):
+        self.invalidate()
+
+    def size(self):
+        return sum(os.path.getsize(path) for path in glob.glob(os.path.join(self.cache_dir, "*.feather")))
+
+    def content_hash(self, gdx_file):
+        """
+        Hash of the content of gdx_file. It is only recomputed when the modification time or size of the file change.
+        """
+        stat = os.stat(gdx_file)
+        signature = "%d %d" % (stat.st_mtime_ns, stat.st_size)
+        hash_path = os.path.join(self.cache_dir, self.__file_key(gdx_file) + "_content.hash")
+        if os.path.isfile(hash_path):
+            with open(hash_path) as f:
+                line = f.read().split("\n")
+            if len(line) == 2 and line[0] == signature:
+                return line[1]
+
+        content_hash = hashlib.sha1()
+        with open(gdx_file, "rb") as f:
+            for data in iter(lambda: f.read(1 << 20), b""):
+                content_hash.update(data)
+        content_hash = content_hash.hexdigest()
+        with open(hash_path, "w") as f:
+            f.write("%s\n%s" % (signature, content_hash))
+        return content_hash
+
+    def __file_key(self, gdx_file):
+        return hashlib.sha1(os.path.abspath(gdx_file).encode("utf-8")).hexdigest()[:16]
+
+    def __entry_path(self, gdx_file, symbol, kwargs):
+        stat = os.stat(gdx_file)
+        key = {
+            "gdx_file": os.path.abspath(gdx_file),
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "hash": self.content_hash(gdx_file),
+            "symbol": symbol,
+            "kwargs": dict((k, v) for k, v in kwargs.items() if k not in IGNORED_KWARGS),
+        }
+        key = hashlib.sha1(json.dumps(key, sort_keys=True, default=_to_json).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "%s_%s.feather" % (self.__file_key(gdx_file), key))
+
+    def __remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _to_json(value):
+    try:
+        return sorted(str(v) for v in value)
+    except TypeError:
+        return repr(value)
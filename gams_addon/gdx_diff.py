@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+import gams
+import numpy as np
+import pandas as pd
+
+from .columnar import VAR_EQU_ATTRIBUTES, UelTable, build_index, cast_index, extract_block, index_names
+from .gams_add_on_exception import GamsAddOnException
+from .instrumentation import stage
+from .workspace import get_workspace
+
+SUMMARY_COLUMNS = ["type", "status", "records_a", "records_b", "only_a", "only_b", "changed"]
+
+
+def gdx_diff(gdx_a, gdx_b, symbols=None, rtol=1e-9, atol=0.0, index_dtype="int"):
+    """
+    Compare two gdx files symbol by symbol (all symbols of both files when symbols is None). Values are equal when
+    they are close within rtol and atol (see numpy.isclose); for variables and equations all attributes are compared.
+
+    Returns a summary DataFrame with one row per symbol and the columns type, status ("equal", "different",
+    "only_a", "only_b" or "type_mismatch"), records_a, records_b, only_a, only_b and changed (record counts), and a
+    dict from symbol name to a DataFrame with the differing records. Its columns hold the values in a and in b
+    (e.g. a, b or L_a, L_b, M_a, ...), NaN where a record is missing.
+    """
+    ws = get_workspace()
+    with stage("add_database_from_gdx"):
+        db_a = ws.add_database_from_gdx(gdx_a)
+        db_b = ws.add_database_from_gdx(gdx_b)
+    return db_diff(db_a, db_b, symbols, rtol, atol, index_dtype)
+
+
+def db_diff(db_a, db_b, symbols=None, rtol=1e-9, atol=0.0, index_dtype="int"):
+    if symbols is None:
+        symbols = [s.name for s in db_a]
+        in_a = set(symbols)
+        symbols += [s.name for s in db_b if s.name not in in_a]
+
+    # both files are read into one UEL table, so equal labels get equal codes
+    uels = UelTable()
+    summary = list()
+    diffs = dict()
+    for symbol in symbols:
+        a = __get_symbol(db_a, symbol)
+        b = __get_symbol(db_b, symbol)
+        if a is None and b is None:
+            raise GamsAddOnException("Symbol %s not found in both files" % symbol)
+        row = dict((c, 0) for c in SUMMARY_COLUMNS)
+        row["type"] = type(a if a is not None else b).__name__
+        row["records_a"] = a.number_records if a is not None else 0
+        row["records_b"] = b.number_records if b is not None else 0
+        if a is None or b is None:
+            row["status"] = "only_b" if a is None else "only_a"
+        elif type(a) != type(b) or a.dimension != b.dimension:
+            row["status"] = "type_mismatch"
+        else:
+            with stage("diff_symbol", symbol) as timing:
+                counts, df = __diff_symbol(a, b, uels, rtol, atol, index_dtype)
+                timing.done(a.number_records + b.number_records, df)
+            row.update(counts)
+            row["status"] = "equal" if df is None else "different"
+            if df is not None:
+                diffs[symbol] = df
+        summary.append(row)
+    summary = pd.DataFrame(summary, index=pd.Index(symbols, name="symbol"), columns=SUMMARY_COLUMNS)
+    return summary, diffs
+
+
+def __get_symbol(db, symbol):
+    try:
+        return db.get_symbol(symbol)
+    except gams.GamsException:
+        return None
+
+
+def __diff_symbol(a, b, uels, rtol, atol, index_dtype):
+    if type(a) in [gams.GamsVariable, gams.GamsEquation]:
+        columns = list(VAR_EQU_ATTRIBUTES.keys())
+        attributes = [VAR_EQU_ATTRIBUTES[c] for c in columns]
+    elif type(a) == gams.GamsParameter:
+        columns = [""]
+        attributes = ["value"]
+    elif type(a) == gams.GamsSet:
+        columns = []
+        attributes = []
+    else:
+        raise GamsAddOnException("ERROR: NOT YET IMPLEMENTED for %s" % type(a))
+
+    block_a = extract_block(a, attributes, uels=uels)
+    block_b = extract_block(b, attributes, uels=uels)
+    counts = {"only_a": 0, "only_b": 0, "changed": 0}
+
+    # cheap check first: same records in the same order and close values
+    if len(block_a) == len(block_b) and np.array_equal(block_a.codes, block_b.codes):
+        changed = ~__close(block_a.values, block_b.values, rtol, atol)
+        if not changed.any():
+            return counts, None
+        position_a = position_b = np.flatnonzero(changed)
+        only_a = only_b = np.zeros(0, dtype=np.int64)
+    else:
+        if a.dimension == 0:
+            keys = np.zeros(len(block_a) + len(block_b), dtype=np.int64)
+        else:
+            keys = np.unique(np.vstack([block_a.codes, block_b.codes]), axis=0, return_inverse=True)[1].ravel()
+        keys_a = keys[:len(block_a)]
+        keys_b = keys[len(block_a):]
+        _, position_a, position_b = np.intersect1d(keys_a, keys_b, assume_unique=True, return_indices=True)
+        only_a = np.flatnonzero(~np.isin(keys_a, keys_b, assume_unique=True))
+        only_b = np.flatnonzero(~np.isin(keys_b, keys_a, assume_unique=True))
+        changed = ~__close(block_a.values[position_a], block_b.values[position_b], rtol, atol)
+        position_a = position_a[changed]
+        position_b = position_b[changed]
+
+    counts = {"only_a": len(only_a), "only_b": len(only_b), "changed": len(position_a)}
+    if not any(counts.values()):
+        return counts, None
+
+    codes = np.vstack([block_a.codes[position_a], block_a.codes[only_a], block_b.codes[only_b]])
+    n_changed, n_a = len(position_a), len(only_a)
+    if attributes:
+        values_a = np.full((len(codes), len(attributes)), np.nan)
+        values_b = np.full((len(codes), len(attributes)), np.nan)
+        values_a[:n_changed + n_a] = np.vstack([block_a.values[position_a], block_a.values[only_a]])
+        values_b[:n_changed] = block_b.values[position_b]
+        values_b[n_changed + n_a:] = block_b.values[only_b]
+        names = [(c + "_" if c else "") + side for c in columns for side in ["a", "b"]]
+        values = np.empty((len(codes), 2 * len(attributes)))
+        values[:, 0::2] = values_a
+        values[:, 1::2] = values_b
+    else:
+        # set membership
+        names = ["a", "b"]
+        values = np.zeros((len(codes), 2), dtype=bool)
+        values[:n_changed + n_a, 0] = True
+        values[:n_changed, 1] = True
+        values[n_changed + n_a:, 1] = True
+
+    if a.dimension == 0:
+        index = pd.RangeIndex(len(codes))
+    else:
+        index = cast_index(build_index(codes, uels, index_names(a)), index_dtype, uels)
+    return counts, pd.DataFrame(values, index=index, columns=names)
+
+
+def __close(values_a, values_b, rtol, atol):
+    """
+    Per record: True when all values are close.
+    """
+    if values_a.shape[1] == 0:
+        return np.ones(len(values_a), dtype=bool)
+    return np.isclose(values_a, values_b, rtol=rtol, atol=atol, equal_nan=True).all(axis=1)
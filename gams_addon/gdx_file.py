@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from .columnar import UelTable
+from .gdx_api import GdxHandle
+from .gdx_to_df import db_to_df
+from .instrumentation import _nbytes
+from .workspace import get_workspace
+
+
+class GdxFile(Mapping):
+    """
+    Metadata-only view of a gdx file: a mapping from symbol name to a GdxSymbol with the type, dimension, domains,
+    number of records and explicit text of the symbol. Listing the symbols only reads the symbol table, no records.
+
+    The DataFrame of a symbol is extracted on first access of its df attribute; the gdx file is then loaded once for
+    all symbols. With memory_budget (in bytes) the least recently used frames are dropped when the kept frames get
+    larger than the budget. The keyword arguments are passed to db_to_df.
+
+        gdx = GdxFile(gdx_file)
+        for symbol in gdx.values():
+            print(symbol.name, symbol.type, symbol.records)
+        df = gdx['Param_S_I'].df
+    """
+
+    def __init__(self, gdx_file, memory_budget=None, workspace=None, **kwargs):
+        self.gdx_file = gdx_file
+        self.memory_budget = memory_budget
+        self.kwargs = kwargs
+        self._workspace = workspace
+        self._db = None
+        self._frames = OrderedDict()
+        self._nbytes = dict()
+        self._uels = None
+        with GdxHandle(gdx_file) as gdx:
+            self._symbols = OrderedDict((info.name, GdxSymbol(self, info)) for info in gdx.symbols())
+
+    @property
+    def db(self):
+        if self._db is None:
+            ws = self._workspace if self._workspace is not None else get_workspace()
+            self._db = ws.add_database_from_gdx(self.gdx_file)
+        return self._db
+
+    @property
+    def uels(self):
+        if self._uels is None:
+            with GdxHandle(self.gdx_file) as gdx:
+                self._uels = UelTable(gdx.uels())
+        return self._uels
+
+    def __getitem__(self, symbol):
+        return self._symbols[symbol]
+
+    def __iter__(self):
+        return iter(self._symbols)
+
+    def __len__(self):
+        return len(self._symbols)
+
+    def nbytes(self):
+        """
+        Size in bytes of the frames that are kept.
+        """
+        return sum(self._nbytes.values())
+
+    def clear(self):
+        self._frames.clear()
+        self._nbytes.clear()
+
+    def _get_df(self, symbol):
+        if symbol in self._frames:
+            # most recently used frames are at the end
+            df = self._frames.pop(symbol)
+            self._frames[symbol] = df
+            return df
+        df = db_to_df(self.db, symbol, uels=self.uels, **self.kwargs)
+        self._frames[symbol] = df
+        self._nbytes[symbol] = _nbytes(df) or 0
+        if self.memory_budget is not None:
+            while len(self._frames) > 1 and self.nbytes() > self.memory_budget:
+                oldest = next(iter(self._frames))
+                del self._frames[oldest]
+                del self._nbytes[oldest]
+        return df
+
+
+class GdxSymbol(object):
+    """
+    Metadata of one symbol of a GdxFile. The records are only read on first access of df.
+    """
+
+    def __init__(self, gdx_file, info):
+        self._gdx_file = gdx_file
+        self.name = info.name
+        self.type = info.type
+        self.dimension = info.dimension
+        self.domains = info.domains
+        self.records = info.records
+        self.text = info.text
+        self.alias_of = info.alias_of
+
+    @property
+    def df(self):
+        if self.alias_of in self._gdx_file:
+            return self._gdx_file[self.alias_of].df
+        return self._gdx_file._get_df(self.name)
+
+    @property
+    def loaded(self):
+        return self.name in self._gdx_file._frames
+
+    def __repr__(self):
+        return "GdxSymbol(%s, %s, dimension=%d, domains=%s, records=%d)" % (self.name, self.type, self.dimension,
+                                                                          self.domains, self.records)
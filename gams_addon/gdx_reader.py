@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+from collections.abc import Mapping
+
+from .columnar import UelTable
+from .domain_info import DomainInfo
+from .gdx_api import GdxHandle
+from .gdx_to_df import db_to_df
+from .workspace import get_workspace
+
+
+class GdxReader(Mapping):
+    """
+    Read-only mapping from symbol name to DataFrame for a single gdx file. The gdx file is loaded once, on first use,
+    and every symbol is only extracted on first access and cached afterwards. The keyword arguments are passed to
+    db_to_df for every symbol.
+
+    All symbols are extracted with one UEL table, read once from the file, so the index labels of all frames are the
+    same string objects. With index_dtype="category" all index levels also share one categories object, and joins
+    between frames compare codes instead of strings.
+    """
+
+    def __init__(self, gdx_file, symbols=None, workspace=None, **kwargs):
+        self.gdx_file = gdx_file
+        self.kwargs = kwargs
+        self._workspace = workspace
+        self._symbols = list(symbols) if symbols is not None else None
+        self._db = None
+        self._domain_info = None
+        self._uels = None
+        self._frames = dict()
+
+    @property
+    def db(self):
+        if self._db is None:
+            ws = self._workspace if self._workspace is not None else get_workspace()
+            self._db = ws.add_database_from_gdx(self.gdx_file)
+        return self._db
+
+    @property
+    def domain_info(self):
+        if self._domain_info is None:
+            self._domain_info = DomainInfo(self.gdx_file)
+        return self._domain_info
+
+    @property
+    def uels(self):
+        if self._uels is None:
+            with GdxHandle(self.gdx_file) as gdx:
+                self._uels = UelTable(gdx.uels())
+        return self._uels
+
+    @property
+    def symbols(self):
+        if self._symbols is None:
+            self._symbols = [s.name for s in self.db]
+        return self._symbols
+
+    def __getitem__(self, symbol):
+        if symbol not in self._frames:
+            if symbol not in self:
+                raise KeyError(symbol)
+            self._frames[symbol] = db_to_df(self.db, symbol, uels=self.uels, **self.kwargs)
+        return self._frames[symbol]
+
+    def __contains__(self, symbol):
+        return symbol in self.symbols
+
+    def __iter__(self):
+        return iter(self.symbols)
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def get_df(self, symbol, **kwargs):
+        """
+        Extract a symbol with other arguments than the ones of the reader; the result is not cached.
+        """
+        if not kwargs:
+            return self[symbol]
+        args = dict(self.kwargs)
+        args.update(kwargs)
+        args["uels"] = self.uels
+        return db_to_df(self.db, symbol, **args)
+
+    def clear(self):
+        self._frames.clear()
+
+
+def gdx_to_dfs(gdx_file, symbols=None, **kwargs):
+    """
+    Load a gdx file once and return a dict-like GdxReader with a DataFrame for each of the symbols (all symbols when
+    symbols is None). The symbols are extracted lazily on first access.
+    """
+    return GdxReader(gdx_file, symbols=symbols, **kwargs)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+import gams
+import numpy as np
+import pandas as pd
+
+from .columnar import VAR_EQU_ATTRIBUTES, UelTable, cast_level, extract_block
+from .domain_info import DomainInfo
+from .gams_add_on_exception import GamsAddOnException
+from .workspace import get_workspace
+
+
+def gdx_to_array(gdx_file, symbol, gams_type="L", fillna=0.0, domain_info=None, index_dtype="int"):
+    """
+    Read a symbol into a dense NumPy array. Every axis spans the full parent set of its domain (as given by
+    DomainInfo); for the universe domain "*" only the labels used by the symbol are taken. Positions without a
+    record are set to fillna (False for sets).
+
+    Returns the array and a list with one named pd.Index of labels per axis.
+    """
+    db = get_workspace().add_database_from_gdx(gdx_file)
+    if domain_info is None:
+        domain_info = DomainInfo(gdx_file)
+    return db_to_array(db, symbol, gams_type, fillna, domain_info, index_dtype)
+
+
+def gdx_to_xarray(gdx_file, symbol, gams_type="L", fillna=0.0, domain_info=None, index_dtype="int"):
+    """
+    Same as gdx_to_array, but returns an xarray.DataArray with the domains as dimensions and the labels as coordinates.
+    """
+    try:
+        import xarray as xr
+    except ImportError:
+        raise GamsAddOnException("gdx_to_xarray needs xarray, install it with: pip install xarray")
+
+    array, axes = gdx_to_array(gdx_file, symbol, gams_type, fillna, domain_info, index_dtype)
+    dims = list()
+    for axis in axes:
+        name = axis.name
+        # xarray needs unique dimension names, e.g. for a parameter over (S, S)
+        n = 2
+        while name in dims:
+            name = "%s_%d" % (axis.name, n)
+            n += 1
+        dims.append(name)
+    coords = dict((dim, axis.values) for dim, axis in zip(dims, axes))
+    return xr.DataArray(array, dims=dims, coords=coords, name=symbol)
+
+
+def db_to_array(db, symbol, gams_type="L", fillna=0.0, domain_info=None, index_dtype="int"):
+    s = db.get_symbol(symbol)
+    if type(s) in [gams.GamsVariable, gams.GamsEquation]:
+        if not isinstance(gams_type, str) or gams_type.upper() not in VAR_EQU_ATTRIBUTES:
+            raise GamsAddOnException("gams_type %s not defined for arrays" % (gams_type,))
+        attributes = [VAR_EQU_ATTRIBUTES[gams_type.upper()]]
+    elif type(s) == gams.GamsParameter:
+        attributes = ["value"]
+    elif type(s) == gams.GamsSet:
+        attributes = []
+    else:
+        raise GamsAddOnException("ERROR: NOT YET IMPLEMENTED for %s" % type(s))
+
+    if domain_info is not None and domain_info.get_sets(symbol) is not None:
+        domains = list(domain_info.get_sets(symbol))
+    else:
+        domains = list(s.domains_as_strings)
+
+    uels = UelTable()
+    block = extract_block(s, attributes, uels=uels)
+
+    axes = list()
+    positions = list()
+    for d, domain in enumerate(domains):
+        labels = __domain_labels(db, domain, domain_info)
+        if labels is None:
+            # universe: the labels used by the symbol, in UEL order
+            used = np.zeros(len(uels) + 1, dtype=bool)
+            used[block.codes[:, d]] = True
+            labels = uels.as_array()[used].tolist()
+        position = np.full(len(uels) + 1, -1, dtype=np.int64)
+        for i, label in enumerate(labels):
+            code = uels.codes.get(label)
+            if code is not None:
+                position[code] = i
+        positions.append(position[block.codes[:, d]])
+        name = domain if domain != "*" else "Dim%d" % (d + 1)
+        axes.append(cast_level(pd.Index(labels, dtype=object, name=name), index_dtype))
+
+    if type(s) == gams.GamsSet:
+        array = np.zeros([len(axis) for axis in axes], dtype=bool)
+        values = True
+    else:
+        array = np.full([len(axis) for axis in axes], fillna, dtype=np.float64)
+        values = block.values[:, 0]
+
+    if positions:
+        # records with labels outside of the domain (relaxed domains) can not be placed
+        inside = np.all([p >= 0 for p in positions], axis=0)
+        if not inside.all():
+            positions = [p[inside] for p in positions]
+            if type(s) != gams.GamsSet:
+                values = values[inside]
+        array[tuple(positions)] = values
+    elif len(block):
+        array[()] = values if type(s) == gams.GamsSet else values[0]
+    return array, axes
+
+
+def __domain_labels(db, domain, domain_info):
+    if domain == "*":
+        return None
+    if domain_info is not None and domain in domain_info.symbols and domain_info.is_alias(domain):
+        domain = domain_info.get_sets(domain)
+        if domain == "*":
+            return None
+    try:
+        domain_set = db.get_set(domain)
+    except gams.GamsException:
+        # a relaxed domain that is not a set of the file: the labels used by the symbol
+        return None
+    return [record.keys[0] for record in domain_set]
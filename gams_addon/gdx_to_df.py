@@ -4,136 +4,359 @@ __author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
 __date__ = "02/08/2018"
 
 import gams
+import numpy as np
 import pandas as pd
 
+from .columnar import (VAR_EQU_ATTRIBUTES, ColumnBlock, UelTable, aggregate_blocks, block_to_frame, cast_index,
+                       filter_records, index_names, int_castable, iter_blocks, map_specials, workspace_eps)
 from .gams_add_on_exception import GamsAddOnException
+from .gdx_api import GdxHandle
+from .gdx_cache import GdxCache
+from .instrumentation import stage
+from .workspace import get_workspace
+
+# records read per block when aggregating
+AGGREGATE_CHUNKSIZE = 1000000
+# (index names, columns) -> empty frame that is copied for every empty symbol with that layout
+_EMPTY_FRAMES = dict()
 
 
 def gdx_to_df(gdx_file, symbol, **kwargs):
-    ws = gams.GamsWorkspace()
-    db = ws.add_database_from_gdx(gdx_file)
-    return db_to_df(db, symbol, **kwargs)
+    """
+    With cache_dir=... the extracted symbol is stored in (and served from) a GdxCache in that directory, cache_size
+    bounds the size of the cache in bytes.
+    """
+    cache_dir = kwargs.pop("cache_dir", None)
+    cache_size = kwargs.pop("cache_size", None)
+    if cache_dir is not None:
+        cache = GdxCache(cache_dir, cache_size)
+        df = cache.load(gdx_file, symbol, kwargs)
+        if df is None:
+            df = gdx_to_df(gdx_file, symbol, **kwargs)
+            cache.store(gdx_file, symbol, kwargs, df)
+        return df
+
+    with stage("gdx_to_df", symbol) as total:
+        with stage("add_database_from_gdx", symbol):
+            db = get_workspace().add_database_from_gdx(gdx_file)
+        df = db_to_df(db, symbol, **kwargs)
+        total.done(data=df)
+    return df
 
 
 def db_to_df(db, symbol, **kwargs):
+    with stage("db_to_df", symbol) as timing:
+        df = __db_to_df(db, symbol, **kwargs)
+        timing.done(getattr(df, "shape", [1])[0], df)
+    return df
+
+
+def __db_to_df(db, symbol, **kwargs):
     s = db.get_symbol(symbol)
+    options = __options(kwargs)
+    gams_type = options["gams_type"]
+    fillna = options["fillna"]
+    filters = options["filter"]
+    uels = options["uels"]
+    value_dtype = options["value_dtype"]
+    specials = options["specials"]
+
+    if s.dimension == 0 and type(s) in [gams.GamsParameter, gams.GamsVariable, gams.GamsEquation]:
+        # scalars do not need an index; as in get_scalars an empty scalar parameter is 0, a variable or equation None
+        if s.number_records == 0:
+            return 0.0 if type(s) == gams.GamsParameter else None
+        columns = __var_equ_columns(gams_type) if type(s) != gams.GamsParameter else None
+        if columns is not None:
+            return __gdx_to_series_scalar(s, columns, specials, fillna)
+        return __gdx_to_df_scalar(s, gams_type, specials, fillna)
+
     if s.number_records == 0:
-        return __gdx_to_df_var_empty(s)
-    gams_type = "L"
-    fillna = 0.0
-    if kwargs is not None:
-        if "fillna" in kwargs.keys():
-            fillna = kwargs["fillna"]
-        if "gams_type" in kwargs.keys():
-            gams_type = kwargs["gams_type"]
+        columns = None
+        if type(s) in [gams.GamsVariable, gams.GamsEquation]:
+            columns = __var_equ_columns(gams_type)
+        return __gdx_to_df_var_empty(s, columns)
 
-    if type(s) in [gams.GamsVariable, gams.GamsEquation]:
-        return __cast_index_to_int(__gdx_to_df_var_equ(s, gams_type, fillna))
+    if options["aggregate"] is not None:
+        df = __gdx_to_df_aggregate(s, gams_type, filters, uels, options["aggregate"], value_dtype, specials, fillna)
+        if not isinstance(df, pd.DataFrame):
+            return df
+    elif type(s) in [gams.GamsVariable, gams.GamsEquation]:
+        df = __gdx_to_df_var_equ(s, gams_type, fillna, filters, uels, value_dtype, specials)
     elif type(s) == gams.GamsParameter:
-        return __cast_index_to_int(__gdx_to_df_par(s, fillna))
+        df = __gdx_to_df_par(s, fillna, filters, uels, value_dtype, specials)
     elif type(s) == gams.GamsSet:
-        return __cast_index_to_int(__gdx_to_df_set(s))
+        df = __gdx_to_df_set(s, filters, uels, options["text"])
     else:
-        exit("ERROR: NOT YET IMPLEMENTED for %s" % type(s))
+        raise GamsAddOnException("ERROR: NOT YET IMPLEMENTED for %s" % type(s))
+    with stage("cast_index", symbol):
+        return __cast_index_to_int(df, options["index_dtype"], options["uels"])
 
 
-def __gdx_to_df_var_empty(symbol):
-    index = pd.MultiIndex.from_tuples([tuple([1] * symbol.dimension)])
-    df = pd.DataFrame(None, index=index, columns=[symbol.name]).dropna()
-    df.index.names = symbol.domains_as_strings
-    return df
+def iter_gdx_chunks(gdx_file, symbol, chunksize=1000000, **kwargs):
+    """
+    Generator over DataFrames of at most chunksize records of a symbol, with the same index names as gdx_to_df. Only
+    one chunk is held in memory at a time.
 
+    When the symbol has more than chunksize records, casting the index to integers is decided per domain, so every
+    chunk gets the same index dtypes: a dimension is cast when all labels of its domain set are integers, a dimension
+    over the universe or a relaxed domain when all UELs of the gdx file are integers.
+    """
+    db = get_workspace().add_database_from_gdx(gdx_file)
+    if kwargs.get("uels") is None and kwargs.get("index_dtype", "int") in ["int", "int32"]:
+        if db.get_symbol(symbol).number_records > chunksize:
+            with GdxHandle(gdx_file) as gdx:
+                kwargs["uels"] = UelTable(gdx.uels())
+    for df in iter_db_chunks(db, symbol, chunksize, **kwargs):
+        yield df
 
-def __gdx_to_df_var_equ(var, gams_type="L", fillna=0.0):
-    if var.domains == []:
-        return __gdx_to_df_scalar(var, gams_type)
 
-    index = pd.MultiIndex.from_tuples([g.keys for g in var])
+def iter_db_chunks(db, symbol, chunksize=1000000, **kwargs):
+    """
+    As iter_gdx_chunks. A database has no list of all its UELs: dimensions over the universe or a relaxed domain are
+    only cast to integers when uels is a UelTable with all labels of the database.
+    """
+    s = db.get_symbol(symbol)
+    options = __options(kwargs)
+    if options["aggregate"] is not None:
+        raise GamsAddOnException("aggregate is not supported for chunked extraction")
+    if s.number_records == 0 or s.dimension == 0:
+        yield db_to_df(db, symbol, **kwargs)
+        return
+    if type(s) not in [gams.GamsVariable, gams.GamsEquation, gams.GamsParameter, gams.GamsSet]:
+        raise GamsAddOnException("ERROR: NOT YET IMPLEMENTED for %s" % type(s))
 
-    if gams_type.upper() == "L":
-        values = [v.level for v in var]
-    elif gams_type.upper() == "M":
-        values = [v.marginal for v in var]
-    elif gams_type.upper() == "UP":
-        values = [v.upper for v in var]
-    elif gams_type.upper() == "LO":
-        values = [v.lower for v in var]
-    elif gams_type.upper() == "SCALE":
-        values = [v.scale for v in var]
-    else:
-        raise GamsAddOnException("gams_type %s not defined" % gams_type)
+    attributes, names, columns = __layout(s, options["gams_type"])
+    castable = None
+    if options["index_dtype"] in ["int", "int32"] and s.number_records > chunksize:
+        # decide once for the whole symbol, so every chunk gets the same index dtypes
+        with stage("int_castable", symbol):
+            castable = __int_castable(s, options["uels"], options["index_dtype"])
+    for df in __iter_frames(s, attributes, names, columns, options["filter"], chunksize, options["uels"],
+                            options["value_dtype"], options["text"], options["specials"], options["fillna"]):
+        with stage("cast_index", symbol):
+            df = __cast_index_to_int(df, options["index_dtype"], options["uels"], castable)
+        yield df
 
-    df = pd.DataFrame(values, index=index, columns=[var.name])
-    df.index.names = __replace_stars(var.domains_as_strings)
-    return df
 
+def __int_castable(s, uels, index_dtype):
+    """
+    Per dimension, whether its labels are cast to integers, decided from the labels of the domain set or, for the
+    universe and relaxed domains, from all labels of uels. The records of the symbol are not read.
+    """
+    uels_castable = None
+    castable = list()
+    for domain in s.domains:
+        if isinstance(domain, gams.GamsSet):
+            castable.append(int_castable((r.keys[0] for r in domain), index_dtype))
+        else:
+            if uels_castable is None:
+                uels_castable = uels is not None and int_castable(uels.labels[1:], index_dtype)
+            castable.append(uels_castable)
+    return castable
 
-def __gdx_to_df_par(par, fillna=0.0):
-    if par.domains == []:
-        return __gdx_to_df_scalar(par)
 
-    index = pd.MultiIndex.from_tuples([g.keys for g in par])
-    values = [v.value for v in par]
+def get_scalars(gdx_file, names, gams_type="L", specials=None):
+    """
+    Read the scalars names of a gdx file into a dict, loading the file once. For variables and equations gams_type
+    selects the attribute. A scalar parameter without a record is 0, a scalar variable or equation without a record
+    is None. specials replaces GAMS special values as in gdx_to_df.
+    """
+    with stage("add_database_from_gdx"):
+        db = get_workspace().add_database_from_gdx(gdx_file)
+    return get_db_scalars(db, names, gams_type, specials)
 
-    df = pd.DataFrame(values, index=index, columns=[par.name])
-    df.index.names = __replace_stars(par.domains_as_strings)
-    return df
 
+def get_db_scalars(db, names, gams_type="L", specials=None):
+    scalars = dict()
+    for name in names:
+        s = db.get_symbol(name)
+        if s.dimension != 0:
+            raise GamsAddOnException("Symbol %s is not a scalar" % name)
+        if s.number_records == 0:
+            scalars[name] = 0.0 if type(s) == gams.GamsParameter else None
+        else:
+            scalars[name] = __gdx_to_df_scalar(s, gams_type, specials)
+    return scalars
 
-def __replace_stars(domain_list):
-    for i, s in enumerate(domain_list):
-        if s == "*":
-            domain_list[i] = "Dim%d" % (i + 1)
-    return domain_list
 
+def __options(kwargs):
+    options = {
+        "gams_type": "L",
+        "fillna": None,
+        "index_dtype": "int",
+        "filter": None,
+        "uels": None,
+        "aggregate": None,
+        "value_dtype": "float64",
+        "text": False,
+        "specials": None,
+    }
+    if kwargs is not None:
+        for key in options.keys():
+            if key in kwargs.keys():
+                options[key] = kwargs[key]
+    return options
 
-def __gdx_to_df_scalar(var, gams_type="L"):
-    if type(var) == gams.GamsParameter:
-        return [v.value for v in var][0]
-    elif gams_type.upper() == "L":
-        return [v.level for v in var][0]
-    elif gams_type.upper() == "M":
-        return [v.marginal for v in var][0]
-    elif gams_type.upper() == "LO":
-        return [v.lower for v in var][0]
-    elif gams_type.upper() == "UP":
-        return [v.upper for v in var][0]
-    elif gams_type.upper() == "SCALE":
-        return [v.scale for v in var][0]
-    else:
+
+def __layout(s, gams_type="L"):
+    """
+    Returns the record attributes to read, the index names and the column names of the frame of a symbol.
+    """
+    names = index_names(s)
+    if type(s) in [gams.GamsVariable, gams.GamsEquation]:
+        columns = __var_equ_columns(gams_type)
+        if columns is None:
+            return [__var_equ_attribute(gams_type)], names, [s.name]
+        return [__var_equ_attribute(t) for t in columns], names, columns
+    elif type(s) == gams.GamsParameter:
+        return ["value"], names, [s.name]
+    return [], names, [s.name]
+
+
+def __iter_frames(s, attributes, names, columns, filters=None, chunksize=None, uels=None, value_dtype="float64",
+                  text=False, specials=None, fillna=None):
+    """
+    For sets with text the explicit text of every member is added as column "text". specials (e.g. {"EPS": 0.0,
+    "NA": np.nan}) replaces GAMS special values and fillna replaces NaN values, block by block while reading.
+    """
+    records = filter_records(s, names, filters)
+    text = text and type(s) == gams.GamsSet
+    blocks = iter_blocks(s, attributes, chunksize, records, uels, value_dtype, text, specials, fillna)
+    while True:
+        with stage("read_records", s.name) as timing:
+            block = next(blocks, None)
+            if block is None:
+                timing.cancel()
+                break
+            timing.done(len(block), [block.codes, block.values])
+
+        with stage("build_index", s.name) as timing:
+            values = None
+            if type(s) == gams.GamsSet:
+                # every record of a set is a member of the set
+                values = np.ones(len(block), dtype=bool)
+            df = block_to_frame(block, names, columns, values)
+            if text:
+                df["text"] = block.texts
+            timing.done(len(df), df)
+        yield df
+
+
+def __gdx_to_df_aggregate(s, gams_type, filters, uels, aggregate, value_dtype="float64", specials=None, fillna=None):
+    """
+    aggregate is a dict with "over", the domain names (or positions) to reduce, and "func", one of "sum", "mean",
+    "max" or "min" (default "sum"). Set members count as 1. Aggregating over all domains returns a float (a Series for
+    more than one attribute).
+    """
+    if type(s) not in [gams.GamsVariable, gams.GamsEquation, gams.GamsParameter, gams.GamsSet]:
+        raise GamsAddOnException("ERROR: NOT YET IMPLEMENTED for %s" % type(s))
+    attributes, names, columns = __layout(s, gams_type)
+    over = aggregate.get("over", [])
+    if isinstance(over, (str, int)):
+        over = [over]
+    positions = set()
+    for name in over:
+        if isinstance(name, int):
+            positions.add(name)
+        elif name in names:
+            positions.add(names.index(name))
+        else:
+            raise GamsAddOnException("Cannot aggregate %s over %s, the domains are %s" % (s.name, name, names))
+    keep = [d for d in range(s.dimension) if d not in positions]
+
+    records = filter_records(s, names, filters)
+    blocks = iter_blocks(s, attributes, AGGREGATE_CHUNKSIZE, records, uels, specials=specials, fillna=fillna)
+    if type(s) == gams.GamsSet:
+        blocks = (__members(block) for block in blocks)
+    with stage("aggregate", s.name) as timing:
+        block = aggregate_blocks(blocks, keep, aggregate.get("func", "sum"))
+        timing.done(len(block), [block.codes, block.values])
+
+    if not keep:
+        values = block.values[0] if len(block) else np.zeros(len(columns))
+        if len(columns) == 1:
+            return float(values[0])
+        return pd.Series(values, index=columns, name=s.name)
+    block.values = block.values.astype(value_dtype, copy=False)
+    return block_to_frame(block, [names[d] for d in keep], columns)
+
+
+def __members(block):
+    return ColumnBlock(block.codes, np.ones((len(block), 1)), block.uels)
+
+
+def __gdx_to_df_var_empty(symbol, columns=None):
+    if columns is None:
+        columns = [symbol.name]
+    names = symbol.domains_as_strings
+    key = (tuple(names), tuple(columns))
+    template = _EMPTY_FRAMES.get(key)
+    if template is None:
+        if names:
+            index = pd.MultiIndex(levels=[pd.Index([], dtype=np.int64)] * len(names), codes=[[]] * len(names),
+                                  names=names)
+        else:
+            index = pd.Index([], dtype=np.int64)
+        template = pd.DataFrame(None, index=index, columns=columns)
+        _EMPTY_FRAMES[key] = template
+    return template.copy()
+
+
+def __var_equ_columns(gams_type):
+    """
+    Returns the list of attributes for gams_type "all" or a list of gams types, None for a single gams type.
+    """
+    if isinstance(gams_type, str):
+        if gams_type.upper() != "ALL":
+            return None
+        return list(VAR_EQU_ATTRIBUTES.keys())
+    return [t.upper() for t in gams_type]
+
+
+def __var_equ_attribute(gams_type):
+    attribute = VAR_EQU_ATTRIBUTES.get(gams_type.upper())
+    if attribute is None:
         raise GamsAddOnException("gams_type %s not defined" % gams_type)
+    return attribute
+
 
+def __gdx_to_df_var_equ(var, gams_type="L", fillna=None, filters=None, uels=None, value_dtype="float64",
+                        specials=None):
+    attributes, names, columns = __layout(var, gams_type)
+    return next(__iter_frames(var, attributes, names, columns, filters, uels=uels, value_dtype=value_dtype,
+                              specials=specials, fillna=fillna))
 
-def __gdx_to_df_set(s):
-    index = pd.MultiIndex.from_tuples([g.keys for g in s])
-    values = [(str(v).split(" ")[-1] == "yes") for v in s]
-    df = pd.DataFrame(values, index=index, columns=[s.name])
-    if s.dimension == 1 and s.domains_as_strings == ["*"]:
-        df.index.names = [s.name]
+
+def __gdx_to_df_par(par, fillna=None, filters=None, uels=None, value_dtype="float64", specials=None):
+    attributes, names, columns = __layout(par)
+    return next(__iter_frames(par, attributes, names, columns, filters, uels=uels, value_dtype=value_dtype,
+                              specials=specials, fillna=fillna))
+
+
+def __gdx_to_df_scalar(var, gams_type="L", specials=None, fillna=None):
+    record = var.first_record()
+    if type(var) == gams.GamsParameter:
+        value = record.value
     else:
-        df.index.names = __replace_stars(s.domains_as_strings)
+        value = getattr(record, __var_equ_attribute(gams_type))
+    if specials or fillna is not None:
+        value = float(map_specials(np.array([value]), specials, fillna, workspace_eps(var.database))[0])
+    return value
 
-    return df
 
+def __gdx_to_series_scalar(var, columns, specials=None, fillna=None):
+    record = var.first_record()
+    values = np.array([getattr(record, __var_equ_attribute(t)) for t in columns])
+    values = map_specials(values, specials, fillna, workspace_eps(var.database))
+    return pd.Series(values, index=columns, name=var.name)
 
-def __cast_index_to_int(df):
-    if type(df) != float:
-        index_names = df.index.names
-        new_index_names = ["idx_%d" % d for d, idx in enumerate(df.index.levels)]
-        df.index.names = new_index_names
 
-        col_names = [col for col in df.columns]
-        new_col_names = ["col_%d" % d for d, col in enumerate(df.columns)]
-        df = df.rename(dict(zip(col_names, new_col_names)), axis=1)
+def __gdx_to_df_set(s, filters=None, uels=None, text=False):
+    attributes, names, columns = __layout(s)
+    return next(__iter_frames(s, attributes, names, columns, filters, uels=uels, text=text))
 
-        df.reset_index(inplace=True)
-        for idx_col in new_index_names:
-            try:
-                df[idx_col] = df[idx_col].astype(int)
-            except:
-                pass
 
-        df.set_index(new_index_names, inplace=True)
-        df.index.names = index_names
-        df = df.rename(dict(zip(new_col_names, col_names)), axis=1)
+def __cast_index_to_int(df, index_dtype="int", uels=None, castable=None):
+    if isinstance(df, pd.DataFrame):
+        df.index = cast_index(df.index, index_dtype, uels, castable)
     return df
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("gams_addon")
+
+_listeners = list()
+
+
+def add_listener(callback):
+    """
+    Call callback(event) for every finished stage. An event is a dict with the keys stage, symbol, seconds, records
+    and nbytes (the size of the data produced by the stage), and error when the stage raised.
+    """
+    _listeners.append(callback)
+
+
+def remove_listener(callback):
+    _listeners.remove(callback)
+
+
+@contextmanager
+def record_stages():
+    """
+    Collect the events of all stages that run inside the with block:
+
+        with record_stages() as events:
+            gdx_to_df(gdx_file, 'x')
+        print(events)
+    """
+    events = list()
+    add_listener(events.append)
+    try:
+        yield events
+    finally:
+        remove_listener(events.append)
+
+
+def stage(name, symbol=None):
+    """
+    Time a stage of an extraction or write. When nobody listens this returns a shared no-op object, so instrumented
+    code only pays for this call.
+
+        with stage("read_records", symbol) as timing:
+            ...
+            timing.done(records=n, data=df)
+
+    The size in bytes of data (a DataFrame, an array or a list of those) is only computed when the stage is recorded.
+    """
+    if not _listeners and not logger.isEnabledFor(logging.DEBUG):
+        return _NULL_STAGE
+    return _Stage(name, symbol)
+
+
+def _nbytes(data):
+    if data is None:
+        return None
+    if hasattr(data, "memory_usage"):
+        usage = data.memory_usage(index=True, deep=False)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    if hasattr(data, "nbytes"):
+        return int(data.nbytes)
+    if isinstance(data, (list, tuple)):
+        return sum(_nbytes(d) or 0 for d in data)
+    return None
+
+
+class _Stage(object):
+    def __init__(self, name, symbol):
+        self.name = name
+        self.symbol = symbol
+        self.records = None
+        self.data = None
+        self.cancelled = False
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self.start
+        if self.cancelled:
+            return
+        nbytes = _nbytes(self.data)
+        self.data = None
+        event = {
+            "stage": self.name,
+            "symbol": self.symbol,
+            "seconds": seconds,
+            "records": self.records,
+            "nbytes": nbytes,
+        }
+        if exc_value is not None:
+            event["error"] = repr(exc_value)
+        logger.debug("%s %s: %.6f s, %s records, %s bytes", self.name, self.symbol, seconds, self.records, nbytes,
+                     extra={"gams_addon": event})
+        for listener in list(_listeners):
+            listener(event)
+
+    def done(self, records=None, data=None):
+        self.records = records
+        self.data = data
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class _NullStage(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def done(self, records=None, data=None):
+        pass
+
+    def cancel(self):
+        pass
+
+
+_NULL_STAGE = _NullStage()
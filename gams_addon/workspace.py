@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+__author__ = 'Hanspeter Höschle <hanspeter.hoeschle@energyville.be>'
+
+import threading
+
+import gams
+
+_local = threading.local()
+
+
+def get_workspace():
+    """
+    Return the GamsWorkspace of the calling thread. Creating a workspace is expensive and the gams objects are not
+    thread-safe, so one workspace is created per thread and reused for every later call.
+    """
+    ws = getattr(_local, "workspace", None)
+    if ws is None:
+        ws = gams.GamsWorkspace()
+        _local.workspace = ws
+    return ws
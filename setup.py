@@ -1,4 +1,4 @@
-from distutils.core import setup
+from setuptools import setup
 
 setup(
     name='gams_addon',
@@ -9,8 +9,19 @@ setup(
     author='Hanspeter Höschle',
     author_email='hanspeter.hoschle@energyville.com',
     description='python package to read out GAMS gdx files into pandas dataframes',
+    python_requires='>=3.7',
     install_requires=[
-        'pandas >= 0.21',
+        'pandas >= 0.24',
+        'numpy',
         'gams'
-    ]
+    ],
+    extras_require={
+        'cache': ['pyarrow'],
+        'convert': ['pyarrow'],
+    },
+    entry_points={
+        'console_scripts': [
+            'gams-addon = gams_addon.cli:main',
+        ],
+    }
 )
@@ -0,0 +1,153 @@
+"""
+Benchmarks of gdx_to_df, db_to_df, the index casting, DomainInfo and add_df_to_db on synthetic databases.
+
+    python benchmark.py --sizes 1000 100000 --dimensions 1 2 4 --labels int str mixed --output results.json
+
+Every measurement is written as one JSON object with the wall time and the peak memory allocated (tracemalloc), so
+that the results of two versions can be compared; the header records the git revision of gams_addon. tracemalloc slows down every allocation, so the memory is measured
+in a separate run that is not timed.
+"""
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import gams
+import numpy as np
+import pandas as pd
+
+import gams_addon as ga
+from create_test_database import create_benchmark_database
+
+# private helper, the module name is shadowed by the gdx_to_df function in the package namespace
+cast_index_to_int = getattr(importlib.import_module('gams_addon.gdx_to_df'), '__cast_index_to_int')
+
+
+def time_call(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def peak_memory(func, *args):
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def git_revision():
+    """
+    git describe of the checkout gams_addon is imported from, None when it is not a git checkout.
+    """
+    try:
+        revision = subprocess.check_output(['git', 'describe', '--always', '--dirty'],
+                                           cwd=os.path.dirname(os.path.abspath(ga.__file__)), stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision.decode('utf-8').strip()
+
+
+def benchmark_database(gdx_file, n_records, dimension, labels, repeat):
+    results = list()
+
+    def add(stage, symbol, seconds, peak):
+        results.append({
+            'stage': stage,
+            'symbol': symbol,
+            'records': n_records,
+            'dimension': dimension,
+            'labels': labels,
+            'seconds': seconds,
+            'peak_bytes': peak,
+        })
+
+    def best_of(stage, symbol, func, setup=None, runs=repeat):
+        # setup() is called before every run, outside of the measurement, and its result is passed to func
+        def arguments():
+            return (setup(),) if setup is not None else ()
+
+        timed = [time_call(func, *arguments()) for _ in range(runs)]
+        add(stage, symbol, min(seconds for _, seconds in timed), peak_memory(func, *arguments()))
+        return timed[-1][0]
+
+    # the setup of the benchmark is only timed, a memory run would write the gdx file a second time
+    _, seconds = time_call(create_benchmark_database, gdx_file, n_records, dimension, labels)
+    add('create_database', None, seconds, None)
+
+    best_of('domain_info', None, lambda: ga.DomainInfo(gdx_file))
+    db = best_of('add_database_from_gdx', None, lambda: gams.GamsWorkspace().add_database_from_gdx(gdx_file))
+
+    for symbol in ['P', 'V', 'S']:
+        best_of('gdx_to_df', symbol, lambda: ga.gdx_to_df(gdx_file, symbol))
+        best_of('db_to_df', symbol, lambda: ga.db_to_df(db, symbol))
+        # the index as it is before casting: a MultiIndex with string labels
+        raw = ga.db_to_df(db, symbol, index_dtype='str')
+        if not isinstance(raw.index, pd.MultiIndex):
+            raw.index = pd.MultiIndex.from_arrays([raw.index])
+        best_of('cast_index_to_int', symbol, lambda: cast_index_to_int(raw.copy(deep=False)))
+
+    df_p = ga.db_to_df(db, 'P')
+    df_v = ga.db_to_df(db, 'V', gams_type=['L', 'M'])
+    df_s = ga.db_to_df(db, 'S')
+    # every run writes into a new database, so all runs measure inserts and not merges into existing records
+    ws = gams.GamsWorkspace()
+    best_of('add_df_to_db', 'P', lambda target: ga.add_df_to_db(df_p, 'P', target, gams.GamsParameter),
+            setup=ws.add_database)
+    best_of('add_df_to_db', 'V', lambda target: ga.add_df_to_db(df_v, 'V', target, gams.GamsVariable),
+            setup=ws.add_database)
+    best_of('add_df_to_db', 'S', lambda target: ga.add_df_to_db(df_s, 'S', target, gams.GamsSet),
+            setup=ws.add_database)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark gams_addon on synthetic gdx files')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000, 10000000])
+    parser.add_argument('--dimensions', type=int, nargs='+', default=[1, 2, 3, 4])
+    parser.add_argument('--labels', nargs='+', default=['int', 'str', 'mixed'], choices=['int', 'str', 'mixed'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default='benchmark_results.json')
+    args = parser.parse_args(argv)
+
+    tmp_dir = tempfile.mkdtemp()
+    results = list()
+    try:
+        for n_records in args.sizes:
+            for dimension in args.dimensions:
+                for labels in args.labels:
+                    gdx_file = os.path.join(tmp_dir, 'benchmark_%d_%d_%s.gdx' % (n_records, dimension, labels))
+                    print('%d records, dimension %d, %s labels' % (n_records, dimension, labels))
+                    results.extend(benchmark_database(gdx_file, n_records, dimension, labels, args.repeat))
+                    os.remove(gdx_file)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'date': datetime.datetime.now().isoformat(),
+            'python': sys.version,
+            'platform': platform.platform(),
+            'gams_addon': git_revision(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'results': results,
+        }, f, indent=2)
+    print('results written to %s' % args.output)
+
+
+if __name__ == '__main__':
+    main()
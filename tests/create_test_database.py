@@ -1,5 +1,8 @@
 __author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
 
+import itertools
+import math
+
 import gams
 
 
@@ -103,4 +106,45 @@ def create_test_database(gdx_file):
     s_r.upper = 1000
     s_r.marginal = 2
 
+    var_s_i = db.add_variable_dc('Var_S_I', gams.VarType.Positive, [set_str, set_int], "Test variable with sets S,I")
+    for i in range(10):
+        for ii in range(10):
+            idx = ('s{0:03d}'.format(i + 1), '{0:d}'.format(ii + 1))
+            r = var_s_i.add_record(idx)
+            r.level = ii + 1
+            r.marginal = 0.5
+            r.upper = 100
+
+    db.export(gdx_file)
+
+
+def create_benchmark_database(gdx_file, n_records, dimension, labels='int'):
+    """
+    Database with a parameter P, a variable V and a set S of dimension dimension with n_records records each.
+    labels is 'int' (1, 2, ...), 'str' (e000001, ...) or 'mixed' (int labels in the even dimensions, str labels in the
+    odd ones).
+    """
+    ws = gams.GamsWorkspace()
+    db = ws.add_database('benchmark_database')
+
+    n_labels = int(math.ceil(n_records ** (1.0 / dimension)))
+    int_labels = ['{0:d}'.format(i + 1) for i in range(n_labels)]
+    str_labels = ['e{0:06d}'.format(i + 1) for i in range(n_labels)]
+    if labels == 'int':
+        domains = [int_labels] * dimension
+    elif labels == 'str':
+        domains = [str_labels] * dimension
+    else:
+        domains = [int_labels if d % 2 == 0 else str_labels for d in range(dimension)]
+
+    param = db.add_parameter('P', dimension, 'benchmark parameter')
+    var = db.add_variable('V', dimension, gams.VarType.Free, 'benchmark variable')
+    s = db.add_set('S', dimension, 'benchmark set')
+    for i, idx in enumerate(itertools.islice(itertools.product(*domains), n_records)):
+        param.add_record(idx).value = i + 0.5
+        r = var.add_record(idx)
+        r.level = i + 0.5
+        r.marginal = -1.0
+        s.add_record(idx)
+
     db.export(gdx_file)
@@ -0,0 +1,57 @@
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+import os
+import shutil
+import tempfile
+import unittest
+
+import gams_addon as ga
+from create_test_database import create_test_database
+from gams_addon.cli import main
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        try:
+            import pyarrow
+        except ImportError:
+            self.skipTest('pyarrow is not installed')
+        self.gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(self.gdx_file)
+        self.out_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+    def test_convert_parquet(self):
+        import pyarrow.parquet as pq
+
+        self.assertEqual(main(['convert', self.gdx_file, self.out_dir, '--chunksize', '30']), 0)
+        self.assertTrue(os.path.isfile(os.path.join(self.out_dir, 'Scalar_P1.parquet')))
+
+        table = pq.read_table(os.path.join(self.out_dir, 'Param_S_I.parquet'))
+        self.assertEqual(table.num_rows, 100)
+        self.assertEqual(table.column_names, ['S', 'I', 'Param_S_I'])
+        self.assertEqual(sum(table.column('Param_S_I').to_pylist()), 1550)
+        self.assertTrue(str(table.schema.field('S').type).startswith('dictionary'))
+
+        table = pq.read_table(os.path.join(self.out_dir, 'Var_S_I.parquet'))
+        self.assertEqual(table.column_names, ['S', 'I', 'L', 'M', 'LO', 'UP', 'SCALE'])
+
+        table = pq.read_table(os.path.join(self.out_dir, 'Param_S_S.parquet'))
+        self.assertEqual(table.column_names, ['S', 'S_2', 'Param_S_S'])
+
+        # value columns of empty symbols are typed like those of other symbols
+        table = pq.read_table(os.path.join(self.out_dir, 'Param_S_E.parquet'))
+        self.assertEqual(table.num_rows, 0)
+        self.assertEqual(str(table.schema.field('Param_S_E').type), 'double')
+        table = pq.read_table(os.path.join(self.out_dir, 'E.parquet'))
+        self.assertEqual(str(table.schema.field('E').type), 'bool')
+
+    def test_convert_arrow_jobs(self):
+        import pyarrow.ipc
+
+        paths = ga.convert_gdx(self.gdx_file, self.out_dir, 'arrow', symbols=['S', 'Param_S_I', 'Var_S_I'], jobs=2)
+        self.assertEqual(sorted(os.path.basename(path) for path in paths),
+                         ['Param_S_I.arrows', 'S.arrows', 'Var_S_I.arrows'])
+        table = pyarrow.ipc.open_stream(os.path.join(self.out_dir, 'S.arrows')).read_all()
+        self.assertEqual(table.num_rows, 10)
@@ -0,0 +1,105 @@
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+import os
+import unittest
+
+import gams
+
+import gams_addon as ga
+from create_test_database import create_test_database
+
+
+class TestDfToDb(unittest.TestCase):
+    def setUp(self):
+        self.gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(self.gdx_file)
+        self.db = gams.GamsWorkspace().add_database_from_gdx(self.gdx_file)
+
+    def test_parameter(self):
+        df = ga.db_to_df(self.db, 'Param_S_I')
+        df['Param_S_I'] = 2.0
+
+        ga.add_df_to_db(df, 'Param_S_I', self.db, gams.GamsParameter)
+        self.assertEqual(sum(ga.db_to_df(self.db, 'Param_S_I')['Param_S_I']), 200)
+
+        ga.add_df_to_db(df, 'New_S_I', self.db, gams.GamsParameter, text='new parameter')
+        new = self.db.get_symbol('New_S_I')
+        self.assertEqual(new.domains_as_strings, ['S', 'I'])
+        self.assertEqual(new.number_records, 100)
+
+        ga.add_df_to_db(ga.db_to_df(self.db, 'Param_P2'), 'New_P2', self.db, gams.GamsParameter)
+        self.assertEqual(self.db.get_symbol('New_P2').domains_as_strings, ['*', '*'])
+
+        ga.add_df_to_db(5.0, 'New_Scalar', self.db, gams.GamsParameter)
+        self.assertEqual(ga.db_to_df(self.db, 'New_Scalar'), 5.0)
+
+    def test_variable(self):
+        df = ga.db_to_df(self.db, 'Var_S_I', gams_type='all')
+        ga.add_df_to_db(df, 'New_Var_S_I', self.db, gams.GamsVariable)
+
+        new = ga.db_to_df(self.db, 'New_Var_S_I', gams_type='all')
+        self.assertEqual(sum(new['L']), 550)
+        self.assertEqual(sum(new['M']), 50)
+        self.assertEqual(sum(new['UP']), 10000)
+
+        df = ga.db_to_df(self.db, 'Var_S_I', gams_type='M')
+        ga.add_df_to_db(df, 'New_Var_M', self.db, gams.GamsVariable, result_type='M')
+        self.assertEqual(sum(ga.db_to_df(self.db, 'New_Var_M', gams_type='M')['New_Var_M']), 50)
+
+        series = ga.db_to_df(self.db, 'Scalar_V1', gams_type='all')
+        ga.add_df_to_db(series, 'New_Scalar_V', self.db, gams.GamsVariable)
+        self.assertEqual(self.db.get_symbol('New_Scalar_V').dimension, 0)
+        new = ga.db_to_df(self.db, 'New_Scalar_V', gams_type='all')
+        self.assertEqual(new['L'], 10)
+        self.assertEqual(new['M'], 2)
+        self.assertEqual(new['UP'], 1000)
+
+    def test_set(self):
+        df = ga.db_to_df(self.db, 'SubSI')
+        ga.add_df_to_db(df, 'New_SubSI', self.db, gams.GamsSet)
+        new = self.db.get_symbol('New_SubSI')
+        self.assertEqual(new.number_records, 25)
+        self.assertEqual(new.domains_as_strings, ['S', 'I'])
+
+    def test_update_db_from_df(self):
+        df = ga.db_to_df(self.db, 'Param_S_I')
+        df = df.iloc[:50].copy()
+        df.iloc[:10, 0] = 1.0
+
+        counts = ga.update_db_from_df(self.db, 'Param_S_I', df)
+        self.assertEqual(counts, {"inserted": 0, "updated": 10, "deleted": 0})
+        self.assertEqual(sum(ga.db_to_df(self.db, 'Param_S_I')['Param_S_I']), 90 * 15.5 + 10)
+
+        counts = ga.update_db_from_df(self.db, 'Param_S_I', df, mode='delete_missing')
+        self.assertEqual(counts, {"inserted": 0, "updated": 0, "deleted": 50})
+        self.assertEqual(self.db.get_symbol('Param_S_I').number_records, 50)
+
+        df = ga.db_to_df(self.db, 'Param_S_S').iloc[:5] * 0 + 2.0
+        df.index.names = ['S', 'I']
+        counts = ga.update_db_from_df(self.db, 'Param_S_I', df, mode='replace')
+        self.assertEqual(counts, {"inserted": 0, "updated": 0, "deleted": 0})
+        counts = ga.update_db_from_df(self.db, 'Param_S_I', df)
+        self.assertEqual(counts, {"inserted": 5, "updated": 0, "deleted": 0})
+        self.assertEqual(self.db.get_symbol('Param_S_I').number_records, 55)
+
+        self.assertRaises(ga.GamsAddOnException, ga.update_db_from_df, self.db, 'Param_S_I', df, 'merge')
+
+    def test_specials(self):
+        param = self.db.get_parameter('Param_S')
+        param.find_record('s001').value = 4.94066E-324
+        param.find_record('s002').value = float('nan')
+        specials = {'EPS': 0.0, 'NA': -1.0}
+
+        df = ga.db_to_df(self.db, 'Param_S', specials=specials)
+        ga.add_df_to_db(df, 'New_S', self.db, gams.GamsParameter, specials=specials)
+        self.assertEqual(self.db.get_parameter('New_S').find_record('s001').value, 4.94066E-324)
+        na = self.db.get_parameter('New_S').find_record('s002').value
+        self.assertTrue(na != na)
+        self.assertEqual(df['Param_S'].iloc[1], -1.0)
+
+        self.assertRaises(ga.GamsAddOnException, ga.add_df_to_db, df, 'New_S', self.db, gams.GamsParameter,
+                          specials={'EPS': 0.0, 'NA': float('nan'), 'UNDF': float('nan')})
+
+    def test_wrong_type(self):
+        df = ga.db_to_df(self.db, 'Param_S_I')
+        self.assertRaises(ga.GamsAddOnException, ga.add_df_to_db, df, 'Param_S_I', self.db, gams.GamsVariable)
+        self.assertRaises(ga.GamsAddOnException, ga.add_df_to_db, df, 'Param_S_I', self.db, float)
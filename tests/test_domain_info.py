@@ -13,4 +13,4 @@ class TestDomainInfo(unittest.TestCase):
 
         di = DomainInfo(gdx_file)
         print(di)
-        self.assertEqual(len(di.symbols), 19)
+        self.assertEqual(len(di.symbols), 20)
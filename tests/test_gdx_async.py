@@ -0,0 +1,55 @@
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+import asyncio
+import importlib
+import os
+import unittest
+
+import gams_addon as ga
+from create_test_database import create_test_database
+
+
+class TestGdxAsync(unittest.TestCase):
+    def setUp(self):
+        self.gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(self.gdx_file)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_agdx_to_df(self):
+        df = self.loop.run_until_complete(ga.agdx_to_df(self.gdx_file, 'Param_S_I'))
+        self.assertEqual(sum(df['Param_S_I']), 1550)
+
+    def test_merge_requests(self):
+        with ga.record_stages() as events:
+            dfs = self.loop.run_until_complete(asyncio.gather(
+                ga.agdx_to_df(self.gdx_file, 'Param_S_I'),
+                ga.agdx_to_df(self.gdx_file, 'Param_S_I'),
+                ga.agdx_to_df(self.gdx_file, 'Param_S_I', index_dtype='str')))
+        self.assertTrue(dfs[0] is dfs[1])
+        self.assertFalse(dfs[0] is dfs[2])
+        self.assertEqual(len([e for e in events if e['stage'] == 'gdx_to_df']), 2)
+
+    def test_timeout(self):
+        self.assertRaises(asyncio.TimeoutError, self.loop.run_until_complete,
+                          ga.agdx_to_df(self.gdx_file, 'Param_S_I', timeout=0))
+
+    def test_no_stale_requests(self):
+        gdx_async = importlib.import_module('gams_addon.gdx_async')
+        for _ in range(3):
+            loop = asyncio.new_event_loop()
+            try:
+                self.assertRaises(asyncio.TimeoutError, loop.run_until_complete,
+                                  ga.agdx_to_df(self.gdx_file, 'Param_S_S', timeout=0))
+            finally:
+                loop.close()
+        # the extractions keep running after the timeouts and remove their entries when done
+        gdx_async.get_executor().shutdown(wait=True)
+        gdx_async.set_max_workers(gdx_async.MAX_WORKERS)
+        self.assertEqual(gdx_async._in_flight, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+import os
+import unittest
+
+import gams
+import numpy as np
+
+import gams_addon as ga
+from create_test_database import create_test_database
+
+
+class TestGdxBatch(unittest.TestCase):
+    def test_gdx_to_df_many(self):
+        gdx_files = dict()
+        for scenario in ['base', 'high']:
+            gdx_files[scenario] = os.path.join(os.getcwd(), 'test_database_%s.gdx' % scenario)
+            create_test_database(gdx_files[scenario])
+        gdx_files['missing'] = os.path.join(os.getcwd(), 'does_not_exist.gdx')
+
+        calls = list()
+        frames, failures = ga.gdx_to_df_many(gdx_files, ['Param_S_I', 'Scalar_P1'], workers=2,
+                                             progress=lambda done, total, scenario: calls.append((done, total)))
+
+        self.assertEqual(list(failures.keys()), ['missing'])
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls[-1], (3, 3))
+
+        df = frames['Param_S_I']
+        self.assertEqual(len(df), 200)
+        self.assertEqual(df.index.names, ['scenario', 'S', 'I'])
+        self.assertEqual(sum(df.loc['high', 'Param_S_I']), 1550)
+        self.assertEqual([level.dtype for level in df.index.levels], [object, object, np.int64])
+
+        scalars = frames['Scalar_P1']
+        self.assertEqual(list(scalars.index), ['base', 'high'])
+        self.assertEqual(scalars['base'], 10)
+
+        for gdx_file in gdx_files.values():
+            if os.path.isfile(gdx_file):
+                os.remove(gdx_file)
+
+    def test_int_cast_over_files(self):
+        gdx_files = list()
+        for scenario, labels in [('ints', ['1', '2']), ('mixed', ['3', 'total'])]:
+            db = gams.GamsWorkspace().add_database()
+            param = db.add_parameter('P', 1, 'parameter')
+            for label in labels:
+                param.add_record(label).value = 1.0
+            gdx_files.append(os.path.join(os.getcwd(), 'test_database_%s.gdx' % scenario))
+            db.export(gdx_files[-1])
+
+        try:
+            frames, failures = ga.gdx_to_df_many(gdx_files, ['P'], workers=1)
+        finally:
+            for gdx_file in gdx_files:
+                os.remove(gdx_file)
+        self.assertEqual(failures, {})
+        self.assertEqual(list(frames['P'].index.get_level_values(1)), ['1', '2', '3', 'total'])
+        self.assertEqual(frames['P'].index.levels[1].dtype, object)
+
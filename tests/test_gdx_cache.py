@@ -0,0 +1,51 @@
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+import os
+import shutil
+import tempfile
+import unittest
+
+import gams_addon as ga
+from create_test_database import create_test_database
+
+
+class TestGdxCache(unittest.TestCase):
+    def setUp(self):
+        self.gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(self.gdx_file)
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_cache(self):
+        df = ga.gdx_to_df(self.gdx_file, 'Param_S_I')
+        cached = ga.gdx_to_df(self.gdx_file, 'Param_S_I', cache_dir=self.cache_dir)
+        self.assertTrue(df.equals(cached))
+
+        cache = ga.GdxCache(self.cache_dir)
+        self.assertTrue(df.equals(cache.load(self.gdx_file, 'Param_S_I', {})))
+        loaded = cache.load(self.gdx_file, 'Param_S_I', {})
+        self.assertEqual([level.dtype for level in loaded.index.levels], [level.dtype for level in df.index.levels])
+        self.assertEqual([f for f in os.listdir(self.cache_dir) if f.endswith('.tmp')], [])
+        self.assertTrue(cache.load(self.gdx_file, 'Param_S_I', {'index_dtype': 'str'}) is None)
+
+        scalar = ga.gdx_to_df(self.gdx_file, 'Scalar_P1', cache_dir=self.cache_dir)
+        self.assertEqual(scalar, 10)
+        self.assertEqual(ga.gdx_to_df(self.gdx_file, 'Scalar_P1', cache_dir=self.cache_dir), 10)
+
+        cache.invalidate(self.gdx_file)
+        self.assertTrue(cache.load(self.gdx_file, 'Param_S_I', {}) is None)
+
+    def test_eviction(self):
+        ga.gdx_to_df(self.gdx_file, 'Param_S_I', cache_dir=self.cache_dir)
+        ga.gdx_to_df(self.gdx_file, 'Param_S_S', cache_dir=self.cache_dir)
+        cache = ga.GdxCache(self.cache_dir)
+        size = cache.size()
+        self.assertTrue(size > 0)
+
+        cache.evict(size - 1)
+        self.assertTrue(cache.load(self.gdx_file, 'Param_S_I', {}) is None or
+                        cache.load(self.gdx_file, 'Param_S_S', {}) is None)
+
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
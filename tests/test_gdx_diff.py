@@ -0,0 +1,61 @@
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+import os
+import unittest
+
+import gams
+
+import gams_addon as ga
+from create_test_database import create_test_database
+
+
+class TestGdxDiff(unittest.TestCase):
+    def setUp(self):
+        self.gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(self.gdx_file)
+
+    def test_equal(self):
+        summary, diffs = ga.gdx_diff(self.gdx_file, self.gdx_file)
+        self.assertTrue((summary['status'] == 'equal').all())
+        self.assertEqual(diffs, {})
+
+    def test_differences(self):
+        db = gams.GamsWorkspace().add_database_from_gdx(self.gdx_file)
+        param = db.get_parameter('Param_S_I')
+        param.find_record(('s001', '1')).value = 1.0
+        param.delete_record(('s001', '2'))
+        param.add_record(('s001', '11')).value = 3.0
+        db.get_variable('Var_S_I').find_record(('s002', '1')).marginal = 1.5
+        db.get_set('SubS').delete_record('s005')
+        db.get_set('E').add_record('e1')
+        db.get_parameter('Scalar_P1').merge_record().value = 11.0
+        db.add_parameter('New_P', 0, 'only in b').add_record().value = 1.0
+        other_file = os.path.join(os.getcwd(), 'test_database_b.gdx')
+        db.export(other_file)
+
+        try:
+            summary, diffs = ga.gdx_diff(self.gdx_file, other_file, rtol=0, atol=1e-6)
+        finally:
+            os.remove(other_file)
+
+        self.assertEqual(summary.loc['Param_S_I', 'status'], 'different')
+        self.assertEqual(list(summary.loc['Param_S_I', ['only_a', 'only_b', 'changed']]), [1, 1, 1])
+        df = diffs['Param_S_I']
+        self.assertEqual(list(df.columns), ['a', 'b'])
+        self.assertEqual(df.loc[('s001', 1)].tolist(), [15.5, 1.0])
+        self.assertTrue(df.loc[('s001', 11), 'a'] != df.loc[('s001', 11), 'a'])
+
+        self.assertEqual(summary.loc['Var_S_I', 'changed'], 1)
+        self.assertEqual(diffs['Var_S_I'].loc[('s002', 1), ['M_a', 'M_b']].tolist(), [0.5, 1.5])
+        self.assertEqual(summary.loc['SubS', 'only_a'], 1)
+        self.assertEqual(diffs['SubS'].index.name, 'S')
+        # a 1-dim set over the universe is named after the set, as in gdx_to_df
+        self.assertEqual(diffs['E'].index.name, 'E')
+        self.assertEqual(ga.gdx_to_df(self.gdx_file, 'S').index.name, 'S')
+        self.assertEqual(summary.loc['Scalar_P1', 'changed'], 1)
+        self.assertEqual(summary.loc['New_P', 'status'], 'only_b')
+        self.assertEqual(summary.loc['Param_S', 'status'], 'equal')
+        self.assertFalse('Param_S' in diffs)
+
+
+if __name__ == '__main__':
+    unittest.main()
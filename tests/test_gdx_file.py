@@ -0,0 +1,44 @@
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+import os
+import unittest
+
+import gams_addon as ga
+from create_test_database import create_test_database
+
+
+class TestGdxFile(unittest.TestCase):
+    def setUp(self):
+        self.gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(self.gdx_file)
+
+    def test_listing(self):
+        gdx = ga.GdxFile(self.gdx_file)
+        self.assertTrue(gdx._db is None)
+        self.assertTrue(gdx._uels is None)
+        self.assertTrue('Param_S_I' in gdx)
+
+        symbol = gdx['Param_S_I']
+        self.assertEqual(symbol.type, 'Par')
+        self.assertEqual(symbol.dimension, 2)
+        self.assertEqual(symbol.domains, ['S', 'I'])
+        self.assertEqual(symbol.records, 100)
+        self.assertEqual(symbol.text, 'Test parameter with sets S,I')
+        self.assertFalse(symbol.loaded)
+        self.assertTrue(gdx._db is None)
+
+        self.assertEqual(sum(symbol.df['Param_S_I']), 1550)
+        self.assertTrue(symbol.loaded)
+        self.assertTrue(symbol.df is symbol.df)
+        self.assertEqual(gdx['Scalar_P1'].df, 10)
+
+    def test_memory_budget(self):
+        gdx = ga.GdxFile(self.gdx_file, memory_budget=1)
+        gdx['Param_S_I'].df
+        gdx['Param_S_S'].df
+        self.assertFalse(gdx['Param_S_I'].loaded)
+        self.assertTrue(gdx['Param_S_S'].loaded)
+        self.assertEqual(len(gdx['Param_S_I'].df), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+import os
+import unittest
+
+import gams_addon as ga
+from create_test_database import create_test_database
+
+
+class TestGdxReader(unittest.TestCase):
+    def test_gdx_to_dfs(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        dfs = ga.gdx_to_dfs(gdx_file, ['S', 'Param_S_I', 'Scalar_P1'])
+        self.assertEqual(len(dfs), 3)
+        self.assertEqual(sorted(dfs.keys()), ['Param_S_I', 'S', 'Scalar_P1'])
+        self.assertEqual(dfs['Scalar_P1'], 10)
+        self.assertEqual(len(dfs['S']), 10)
+        self.assertEqual(sum(dfs['Param_S_I']['Param_S_I']), 1550)
+        self.assertTrue(dfs['S'] is dfs['S'])
+        self.assertFalse('Param_S_S' in dfs)
+        self.assertRaises(KeyError, lambda: dfs['Param_S_S'])
+
+    def test_all_symbols(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        reader = ga.GdxReader(gdx_file)
+        self.assertTrue('Param_S_S' in reader)
+        self.assertEqual(len(reader['Param_S_S']), 100)
+        self.assertEqual(reader.get_df('Scalar_V1', gams_type='M'), 2)
+        self.assertEqual(reader['Scalar_V1'], 10)
+
+        domain_info = reader.domain_info
+        self.assertTrue(domain_info is reader.domain_info)
+        self.assertEqual(domain_info.get_sets('Param_S_I'), ['S', 'I'])
+        self.assertEqual(domain_info.get_sets('Scalar_P1'), None)
+
+    def test_shared_categories(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        dfs = ga.gdx_to_dfs(gdx_file, index_dtype='category')
+        s_i = dfs['Param_S_I']
+        s_s = dfs['Param_S_S']
+        s = dfs['S']
+        self.assertTrue(s_i.index.levels[0].dtype is s_s.index.levels[1].dtype)
+        self.assertTrue(s.index.dtype is s_i.index.levels[1].dtype)
+        self.assertEqual(list(s.index.astype(str)), ['s{0:03d}'.format(i + 1) for i in range(10)])
+        self.assertEqual(list(s_i.index.get_level_values('I').astype(str)[:3]), ['1', '2', '3'])
+        self.assertEqual(sum(s_i['Param_S_I']), 1550)
+
+        dfs = ga.gdx_to_dfs(gdx_file, index_dtype='str')
+        self.assertTrue(dfs['Param_S_I'].index.levels[0][0] is dfs['Param_S_S'].index.levels[0][0])
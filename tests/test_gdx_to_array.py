@@ -0,0 +1,67 @@
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+import os
+import unittest
+
+import gams
+import numpy as np
+
+import gams_addon as ga
+from create_test_database import create_test_database
+
+
+class TestGdxToArray(unittest.TestCase):
+    def test_gdx_to_array(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        array, axes = ga.gdx_to_array(gdx_file, 'Param_S_I')
+        self.assertEqual(array.shape, (10, 10))
+        self.assertEqual([axis.name for axis in axes], ['S', 'I'])
+        self.assertEqual(list(axes[1]), list(range(1, 11)))
+        self.assertEqual(array.sum(), 1550)
+
+        # SubSI only has records for 5 x 5 of its 10 x 10 domain
+        array, axes = ga.gdx_to_array(gdx_file, 'SubSI')
+        self.assertEqual(array.shape, (10, 10))
+        self.assertEqual(array.dtype, bool)
+        self.assertEqual(array.sum(), 25)
+
+        array, axes = ga.gdx_to_array(gdx_file, 'Param_S_E', fillna=np.nan)
+        self.assertEqual(array.shape, (10, 0))
+
+        array, axes = ga.gdx_to_array(gdx_file, 'Param_S', fillna=-1)
+        self.assertEqual(array[0], 10.5)
+
+        array, axes = ga.gdx_to_array(gdx_file, 'Var_S_I', gams_type='M')
+        self.assertEqual(array.sum(), 50)
+
+        array, axes = ga.gdx_to_array(gdx_file, 'Param_P2')
+        self.assertEqual([axis.name for axis in axes], ['Dim1', 'Dim2'])
+        self.assertEqual(array.shape, (10, 10))
+
+        array, axes = ga.gdx_to_array(gdx_file, 'Scalar_P1')
+        self.assertEqual(array.shape, ())
+        self.assertEqual(float(array), 10)
+
+    def test_relaxed_domain(self):
+        db = gams.GamsWorkspace().add_database()
+        param = db.add_parameter_dc('P', ['region'], 'parameter over a relaxed domain')
+        param.add_record('north').value = 1.0
+        param.add_record('south').value = 2.0
+
+        array, axes = ga.db_to_array(db, 'P')
+        self.assertEqual(list(axes[0]), ['north', 'south'])
+        self.assertEqual(axes[0].name, 'region')
+        self.assertEqual(array.tolist(), [1.0, 2.0])
+
+    def test_gdx_to_xarray(self):
+        try:
+            import xarray
+        except ImportError:
+            self.skipTest('xarray is not installed')
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        data_array = ga.gdx_to_xarray(gdx_file, 'Param_S_S')
+        self.assertEqual(data_array.dims, ('S', 'S_2'))
+        self.assertEqual(float(data_array.sel(S='s001', S_2='s002')), 15.5)
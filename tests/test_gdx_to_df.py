@@ -1,8 +1,14 @@
 __author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
 import os
+import tracemalloc
 import unittest
 
+import gams
+import numpy as np
+import pandas as pd
+
 import gams_addon as ga
+from gams_addon.columnar import UelTable, cast_index
 from create_test_database import create_test_database
 
 
@@ -149,6 +155,236 @@ class TestGdxToDf(unittest.TestCase):
         self.assertEqual(df, 1)
         self.assertEqual(type(df), float)
 
+        s = ga.gdx_to_df(gdx_file, 'Scalar_V1', domain_info=domain_info, gams_type=["L", "M"])
+        self.assertEqual(list(s.index), ["L", "M"])
+        self.assertEqual(s["L"], 10)
+        self.assertEqual(s["M"], 2)
+
+        df = ga.gdx_to_df(gdx_file, 'Var_S_I', domain_info=domain_info)
+        self.assertEqual(len(df), 100)
+        self.assertEqual(sum(df['Var_S_I']), 550)
+        self.assertEqual(df.index.names, ['S', 'I'])
+        self.assertEqual(df.columns, ['Var_S_I'])
+
+        df = ga.gdx_to_df(gdx_file, 'Var_S_I', domain_info=domain_info, gams_type=["L", "M"])
+        self.assertEqual(len(df), 100)
+        self.assertEqual(list(df.columns), ['L', 'M'])
+        self.assertEqual(sum(df['L']), 550)
+        self.assertEqual(sum(df['M']), 50)
+        self.assertEqual(df.index.names, ['S', 'I'])
+
+        df = ga.gdx_to_df(gdx_file, 'Var_S_I', domain_info=domain_info, gams_type="all")
+        self.assertEqual(list(df.columns), ['L', 'M', 'LO', 'UP', 'SCALE'])
+        self.assertEqual(sum(df['UP']), 10000)
+
+    def test_index_dtype(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        df = ga.gdx_to_df(gdx_file, 'Param_S_I')
+        self.assertEqual(df.index.levels[0].dtype, object)
+        self.assertEqual(df.index.levels[1].dtype, np.int64)
+
+        df = ga.gdx_to_df(gdx_file, 'Param_S_I', index_dtype="str")
+        self.assertEqual(list(df.index.levels[1]), ['{0:d}'.format(i + 1) for i in range(10)])
+
+        df = ga.gdx_to_df(gdx_file, 'Param_S_I', index_dtype="category")
+        self.assertTrue(isinstance(df.index.levels[0], pd.CategoricalIndex))
+        self.assertEqual(sum(df['Param_S_I']), 1550)
+
+        df = ga.gdx_to_df(gdx_file, 'I', index_dtype="category")
+        self.assertTrue(isinstance(df.index, pd.CategoricalIndex))
+        self.assertEqual(df.index.name, 'I')
+
+        self.assertRaises(ga.GamsAddOnException, ga.gdx_to_df, gdx_file, 'I', index_dtype="float")
+
+    def test_filter(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        df = ga.gdx_to_df(gdx_file, 'Param_S_I', filter={'S': ['s001', 's003']})
+        self.assertEqual(len(df), 20)
+        self.assertEqual(list(df.index.levels[0]), ['s001', 's003'])
+
+        df = ga.gdx_to_df(gdx_file, 'Param_S_I', filter={'S': 's002', 'I': range(1, 4)})
+        self.assertEqual(len(df), 3)
+        self.assertEqual(list(df.index.get_level_values('I')), [1, 2, 3])
+
+        df = ga.gdx_to_df(gdx_file, 'Var_S_I', filter={'I': [10]}, gams_type='all')
+        self.assertEqual(len(df), 10)
+        self.assertEqual(sum(df['L']), 100)
+
+        df = ga.gdx_to_df(gdx_file, 'SubSI', filter={'S': ['s001', 's999']})
+        self.assertEqual(len(df), 5)
+
+        df = ga.gdx_to_df(gdx_file, 'Param_S_I', filter={'S': ['s999']})
+        self.assertTrue(df.empty)
+
+        self.assertRaises(ga.GamsAddOnException, ga.gdx_to_df, gdx_file, 'Param_S_I', filter={'T': [1]})
+
+    def test_iter_gdx_chunks(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        chunks = list(ga.iter_gdx_chunks(gdx_file, 'Param_S_I', chunksize=30))
+        self.assertEqual([len(df) for df in chunks], [30, 30, 30, 10])
+        for df in chunks:
+            self.assertEqual(df.index.names, ['S', 'I'])
+            self.assertEqual(df.index.levels[1].dtype, np.int64)
+        self.assertTrue(pd.concat(chunks).equals(ga.gdx_to_df(gdx_file, 'Param_S_I')))
+
+        chunks = list(ga.iter_gdx_chunks(gdx_file, 'Var_S_I', chunksize=50, gams_type=['L', 'M']))
+        self.assertEqual([len(df) for df in chunks], [50, 50])
+        self.assertEqual(list(chunks[0].columns), ['L', 'M'])
+
+        chunks = list(ga.iter_gdx_chunks(gdx_file, 'Param_S_E', chunksize=50))
+        self.assertEqual(len(chunks), 1)
+        self.assertTrue(chunks[0].empty)
+
+    def test_compact_dtypes(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        df = ga.gdx_to_df(gdx_file, 'Param_S_I', value_dtype='float32', index_dtype='int32')
+        self.assertEqual(df['Param_S_I'].dtype, np.float32)
+        self.assertEqual(df.index.levels[1].dtype, np.int32)
+        self.assertEqual(df.index.levels[0].dtype, object)
+        self.assertEqual(sum(df['Param_S_I']), 1550)
+
+        df = ga.gdx_to_df(gdx_file, 'Var_S_I', gams_type='all', value_dtype='float32')
+        self.assertTrue((df.dtypes == np.float32).all())
+
+        db = gams.GamsWorkspace().add_database_from_gdx(gdx_file)
+        db.get_set('SubS').find_record('s002').text = 'second'
+        df = ga.db_to_df(db, 'SubS', text=True)
+        self.assertEqual(list(df.columns), ['SubS', 'text'])
+        self.assertEqual(df['SubS'].dtype, bool)
+        self.assertEqual(df.loc['s002', 'text'], 'second')
+
+        ga.add_df_to_db(df, 'New_SubS', db, gams.GamsSet)
+        new = ga.db_to_df(db, 'New_SubS', text=True)
+        self.assertEqual(len(new), len(df))
+        self.assertEqual(new.loc['s002', 'text'], 'second')
+
+    def test_specials(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+        db = gams.GamsWorkspace().add_database_from_gdx(gdx_file)
+        param = db.get_parameter('Param_S')
+        param.find_record('s001').value = 4.94066E-324
+        param.find_record('s002').value = float('nan')
+        param.find_record('s003').value = float('inf')
+
+        df = ga.db_to_df(db, 'Param_S', specials={'EPS': 0.0, 'NA': -1.0, 'INF': 1e6})
+        self.assertEqual(df['Param_S'].iloc[:4].tolist(), [0.0, -1.0, 1e6, 7.5])
+
+        df = ga.db_to_df(db, 'Param_S', specials={'EPS': 0.0}, fillna=-2.0, value_dtype='float32')
+        self.assertEqual(df['Param_S'].iloc[:3].tolist(), [0.0, -2.0, float('inf')])
+        df = ga.db_to_df(db, 'Param_S', value_dtype='float32')
+        self.assertEqual(df['Param_S'].iloc[0], 0.0)
+        self.assertTrue(np.isnan(ga.db_to_df(db, 'Param_S')['Param_S'].iloc[1]))
+        self.assertRaises(ga.GamsAddOnException, ga.db_to_df, db, 'Param_S', specials={'EPSILON': 0.0})
+
+        # with my_eps set, the records return my_eps for EPS
+        db.workspace.my_eps = -0.5
+        param.find_record('s001').value = -0.5
+        df = ga.db_to_df(db, 'Param_S', specials={'EPS': 0.0})
+        self.assertEqual(df['Param_S'].iloc[0], 0.0)
+
+    def test_aggregate(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        df = ga.gdx_to_df(gdx_file, 'Var_S_I', aggregate={'over': ['S'], 'func': 'sum'})
+        expected = ga.gdx_to_df(gdx_file, 'Var_S_I').groupby(level='I').sum()
+        self.assertEqual(df.index.names, ['I'])
+        self.assertEqual(df.index.dtype, np.int64)
+        self.assertTrue(np.allclose(df['Var_S_I'].to_numpy(), expected['Var_S_I'].to_numpy()))
+
+        df = ga.gdx_to_df(gdx_file, 'Var_S_I', gams_type=['L', 'UP'], aggregate={'over': 'I', 'func': 'max'})
+        self.assertEqual(list(df.columns), ['L', 'UP'])
+        self.assertEqual(len(df), 10)
+        self.assertEqual(df['UP'].max(), 100)
+
+        df = ga.gdx_to_df(gdx_file, 'Param_S_I', aggregate={'over': [1], 'func': 'mean'},
+                          filter={'S': ['s001', 's002']})
+        self.assertEqual(df['Param_S_I'].tolist(), [15.5, 15.5])
+
+        self.assertEqual(ga.gdx_to_df(gdx_file, 'SubSI', aggregate={'over': ['S', 'I']}), 25)
+        self.assertEqual(ga.gdx_to_df(gdx_file, 'Param_S_I', aggregate={'over': ['S', 'I']}), 1550)
+        self.assertRaises(ga.GamsAddOnException, ga.gdx_to_df, gdx_file, 'Param_S_I', aggregate={'over': ['T']})
+        self.assertRaises(ga.GamsAddOnException, ga.gdx_to_df, gdx_file, 'Param_S_I',
+                          aggregate={'over': ['S'], 'func': 'median'})
+
+    def test_get_scalars(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        scalars = ga.get_scalars(gdx_file, ['Scalar_P1', 'Scalar_P2', 'Scalar_V1'])
+        self.assertEqual(scalars, {'Scalar_P1': 10, 'Scalar_P2': 10, 'Scalar_V1': 10})
+        self.assertEqual(ga.get_scalars(gdx_file, ['Scalar_V1'], gams_type='M'), {'Scalar_V1': 2})
+        self.assertRaises(ga.GamsAddOnException, ga.get_scalars, gdx_file, ['Param_S_I'])
+
+        db = gams.GamsWorkspace().add_database_from_gdx(gdx_file)
+        db.add_parameter('Empty_P', 0, 'scalar parameter without a record')
+        db.add_variable('Empty_V', 0, gams.VarType.Free, 'scalar variable without a record')
+        self.assertEqual(ga.db_to_df(db, 'Empty_P'), 0.0)
+        self.assertTrue(ga.db_to_df(db, 'Empty_V') is None)
+        self.assertEqual(ga.get_db_scalars(db, ['Empty_P', 'Empty_V']), {'Empty_P': 0.0, 'Empty_V': None})
+
+        # empty frames are copies of one template
+        df = ga.gdx_to_df(gdx_file, 'Param_S_E')
+        df.index.names = ['A', 'B']
+        self.assertEqual(ga.gdx_to_df(gdx_file, 'Param_S_E').index.names, ['S', 'E'])
+
+    def test_iter_chunks_int_cast(self):
+        db = gams.GamsWorkspace().add_database()
+        param = db.add_parameter('P', 1, 'labels that are only partly integers')
+        for label in ['1', '2', '3', 'total']:
+            param.add_record(label).value = 1.0
+
+        chunks = list(ga.iter_db_chunks(db, 'P', chunksize=2))
+        self.assertEqual([chunk.index.dtype for chunk in chunks], [object, object])
+        self.assertEqual(list(pd.concat(chunks).index), ['1', '2', '3', 'total'])
+
+        # without a UEL list labels over the universe are kept as strings
+        param.delete_record('total')
+        chunks = list(ga.iter_db_chunks(db, 'P', chunksize=2))
+        self.assertEqual([chunk.index.dtype for chunk in chunks], [object, object])
+        chunks = list(ga.iter_db_chunks(db, 'P', chunksize=2, uels=UelTable(['1', '2', '3'])))
+        self.assertEqual([chunk.index.dtype for chunk in chunks], [np.int64, np.int64])
+
+        db = gams.GamsWorkspace().add_database()
+        param = db.add_parameter('P', 1, 'integer labels')
+        for label in ['1', '2', '3']:
+            param.add_record(label).value = 1.0
+        gdx_file = os.path.join(os.getcwd(), 'test_database_chunks.gdx')
+        db.export(gdx_file)
+        chunks = list(ga.iter_gdx_chunks(gdx_file, 'P', chunksize=2))
+        self.assertEqual([chunk.index.dtype for chunk in chunks], [np.int64, np.int64])
+        self.assertEqual(list(pd.concat(chunks).index), [1, 2, 3])
+
+    def test_cast_index_memory(self):
+        n = 1000000
+        levels = [pd.Index(['{0:d}'.format(i) for i in range(1000)], dtype=object),
+                  pd.Index(['t{0:04d}'.format(i) for i in range(1000)], dtype=object)]
+        codes = [np.arange(n) // 1000, np.arange(n) % 1000]
+        index = pd.MultiIndex(levels=levels, codes=codes, names=['I', 'T'])
+        values = np.ones(n)
+
+        tracemalloc.start()
+        try:
+            cast = cast_index(index)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(cast.levels[0].dtype, np.int64)
+        self.assertEqual(cast.levels[1].dtype, object)
+        self.assertTrue(np.shares_memory(cast.codes[0], index.codes[0]))
+        # only the unique labels are converted: far less memory than a single column of the frame
+        self.assertLess(peak, values.nbytes / 10)
+
     def test_own_gdx_files(self):
         gdx_file = os.path.join('C:/Users/hhoschle/Desktop/kris_master_thesis/.gams/output_data_ref_0.gdx')
 
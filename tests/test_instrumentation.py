@@ -0,0 +1,33 @@
+__author__ = 'Hanspeter Hoeschle <hanspeter.hoeschle@gmail.com>'
+import os
+import unittest
+
+import gams
+
+import gams_addon as ga
+from create_test_database import create_test_database
+from gams_addon.instrumentation import record_stages
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_record_stages(self):
+        gdx_file = os.path.join(os.getcwd(), 'test_database.gdx')
+        create_test_database(gdx_file)
+
+        with record_stages() as events:
+            df = ga.gdx_to_df(gdx_file, 'Param_S_I')
+            ga.add_df_to_db(df, 'Param_S_I', gams.GamsWorkspace().add_database(), gams.GamsParameter)
+
+        stages = [event['stage'] for event in events]
+        for name in ['add_database_from_gdx', 'read_records', 'build_index', 'cast_index', 'db_to_df', 'gdx_to_df',
+                     'add_df_to_db']:
+            self.assertTrue(name in stages, name)
+
+        read = [event for event in events if event['stage'] == 'read_records'][0]
+        self.assertEqual(read['symbol'], 'Param_S_I')
+        self.assertEqual(read['records'], 100)
+        self.assertTrue(read['nbytes'] > 0)
+        self.assertTrue(read['seconds'] >= 0)
+
+        ga.gdx_to_df(gdx_file, 'Param_S_I')
+        self.assertEqual(len(events), len(stages))